@@ -1,188 +1,62 @@
-import os
-import json
-import math
-import pandas as pd
-import gspread
-from google.oauth2.service_account import Credentials
-from pathlib import Path
+import argparse
 
-
-# ================= CONFIG =================
-SPREADSHEET_NAME = "Options Gamma Log"
-RAW_SHEET = "raw_daily"
-DATA_PATH = Path("data/snapshots")
-
-REQUIRED_COLUMNS = {"date", "symbol"}
-
-EXPECTED_HEADER = [
-    "date","week","symbol","spot",
-    "dnz_low","dnz_mid","dnz_high","dnz_width",
-    "spot_position","spot_bucket","gamma_bucket","regime",
-    "gamma_above","gamma_below","gamma_total","gamma_diff","gamma_ratio",
-    "gamma_asym_strength","effective_gamma_pressure","egp_normalized",
-    "gamma_peak_price","gamma_concentration","gamma_distance_from_spot",
-
-    "close_t+1","close_t+2","close_t+5",
-    "ret_t+1","ret_t+2","ret_t+5",
-    "days_to_close_t+1","days_to_close_t+2","days_to_close_t+5",
-
-    "data_ok","event_flag",
-    "is_event_day","event_type","event_phase",
-
-    # === KROK A — INTRADAY STRUCTURE ===
-    "day_direction",
-    "range_expansion",
-    "close_location",
-
-    # === KROK B — STABILITY ===
-    "spot_bucket_streak",
-    "gamma_bucket_streak",
-    "regime_streak",
-
-    # === KROK C — CROSS SYMBOL ===
-    "symbols_same_spot_bucket",
-    "symbols_same_gamma_bucket",
-    "cross_symbol_alignment",
-
-    # === KROK D — EVENT × STRUCTURE ===
-    "event_structure_tag",
-    "event_risk_flag",
-
-    # === KROK E — QUALITY ===
-    "regime_quality_score",
-
-    # === PIPELINE METADATA ===
-    "created_at_utc",
-    "pipeline_version",
-    "run_id",
-
-]
-    
-
-
-# ================= AUTH =================
-def get_client():
-    creds_json = json.loads(os.environ["GOOGLE_SHEETS_CREDENTIALS"])
-    scopes = [
-        "https://www.googleapis.com/auth/spreadsheets",
-        "https://www.googleapis.com/auth/drive",
-    ]
-    creds = Credentials.from_service_account_info(creds_json, scopes=scopes)
-    return gspread.authorize(creds)
-
-
-# ================= LOAD EXISTING RAW =================
-def load_existing_keys_and_header(ws):
-    values = ws.get_all_values()
-
-    if not values:
-        raise RuntimeError("❌ RAW sheet is empty — header required")
-
-    header = [h.strip().lower() for h in values[0]]
-
-    # 🔒 HARD SCHEMA GUARD — JEDYNE MIEJSCE
-    if header != EXPECTED_HEADER:
-        raise RuntimeError(
-            "❌ RAW_DAILY SCHEMA DRIFT — STOP APPEND\n"
-            f"Expected: {EXPECTED_HEADER}\n"
-            f"Found:    {header}"
-        )
-
-    date_idx = header.index("date")
-    symbol_idx = header.index("symbol")
-
-    keys = set()
-    for r in values[1:]:
-        if len(r) > max(date_idx, symbol_idx):
-            keys.add((r[date_idx], r[symbol_idx]))
-
-    # next free row (1-indexed)
-    start_row = len(values) + 1
-
-    return keys, header, start_row
-
-
-# ================= CLEAN CELL =================
-def clean_value(x):
-    if x is None:
-        return ""
-    if isinstance(x, float):
-        if math.isnan(x) or math.isinf(x):
-            return ""
-        return float(x)
-    return x
-
-
-# ================= SAFE APPEND =================
-def append_rows_strict(ws, rows, header, start_row):
-    col_map = {col: i + 1 for i, col in enumerate(header)}
-    updates = []
-
-    for i, row in enumerate(rows):
-        sheet_row = start_row + i
-        for col, val in zip(header, row):
-            if val in ["", None]:
-                continue
-            updates.append({
-                "range": gspread.utils.rowcol_to_a1(sheet_row, col_map[col]),
-                "values": [[val]],
-            })
-
-    if updates:
-        ws.batch_update(updates, value_input_option="USER_ENTERED")
-        print(f"[OK] Appended {len(rows)} new raw rows (schema-safe)")
-    else:
-        print("[OK] Nothing to append")
+import ingest_manifest
+import instrument
+import snapshot_store
+from storage import get_storage
 
 
 # ================= MAIN =================
-def main():
-    if not DATA_PATH.exists():
-        print("[EXIT] No snapshots directory")
-        return
-
-    gc = get_client()
-    ws = gc.open(SPREADSHEET_NAME).worksheet(RAW_SHEET)
-
-    existing_keys, header, start_row = load_existing_keys_and_header(ws)
-    rows_to_add = []
-
-    for file in sorted(DATA_PATH.glob("*.csv")):
-        try:
-            df = pd.read_csv(file)
-        except Exception as e:
-            print(f"[SKIP] {file.name} — cannot read CSV ({e})")
-            continue
-
-        df.columns = [c.strip().lower() for c in df.columns]
-
-        # 🔒 snapshot sanity check
-        if not REQUIRED_COLUMNS.issubset(df.columns):
-            print(
-                f"[SKIP] {file.name} — missing columns "
-                f"{REQUIRED_COLUMNS - set(df.columns)}"
-            )
-            continue
-
-        for _, r in df.iterrows():
-            key = (str(r["date"]), str(r["symbol"]))
-            if key in existing_keys:
-                continue
-
-            row = []
-            for col in header:
-                val = r[col] if col in r else ""
-                row.append(clean_value(val))
-
-            rows_to_add.append(row)
-            existing_keys.add(key)
+def main(storage=None, snapshots=None, full=False):
+    """
+    Appends snapshot rows whose (date, symbol) is not stored yet.
+    `snapshots` lets the orchestrator hand over the rows it just built.
+    Without it only store files that are new or changed since the last
+    run against this storage target are opened (see ingest_manifest);
+    full=True rescans the store.
+    """
+    storage = storage or get_storage()
+    with instrument.span("append.existing_keys"):
+        existing_keys = storage.existing_keys()
+
+    manifest, scope, files = None, None, []
+    if snapshots is None:
+        with instrument.span("append.read_store"):
+            if full:
+                snapshots = snapshot_store.read()
+            else:
+                manifest = ingest_manifest.load(storage.target)
+                scope = ingest_manifest.scoped(manifest, storage.target)
+                if ingest_manifest.verify(scope, existing_keys):
+                    print(f"[WARN] {storage.target} lost ingested rows — rescanning the store")
+                files = ingest_manifest.pending(scope)
+                snapshots = ingest_manifest.read_new_rows(files, existing_keys)
+        instrument.count("append.files_in", len(files))
+    instrument.count("append.rows_in", len(snapshots))
+
+    if snapshots.empty:
+        print("[OK] No new snapshot rows in store")
+    else:
+        keys = list(zip(snapshots["date"].astype(str), snapshots["symbol"].astype(str)))
+        new_rows = snapshots[[k not in existing_keys for k in keys]]
 
-    if not rows_to_add:
-        print("[OK] No new snapshot rows to append")
-        return
+        if new_rows.empty:
+            print("[OK] No new snapshot rows to append")
+        else:
+            with instrument.span("append.write"):
+                storage.append_raw(new_rows)
+            instrument.count("append.rows_appended", len(new_rows))
 
-    append_rows_strict(ws, rows_to_add, header, start_row)
+    # only after the rows are safely in RAW
+    if manifest is not None:
+        ingest_manifest.record(scope, files)
+        ingest_manifest.save(manifest)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Append new store snapshots to RAW_DAILY")
+    parser.add_argument("--full", action="store_true", help="rescan the whole store, ignoring the manifest")
+    args = parser.parse_args()
+
+    main(full=args.full)
+    instrument.write_report(entry="append_snapshots_to_raw")
\ No newline at end of file
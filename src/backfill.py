@@ -0,0 +1,176 @@
+import argparse
+import sys
+import time
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import instrument
+import main as snapshot
+import snapshot_store
+from chain_cache import CACHE_PATH
+
+# ================= CONFIG =================
+# one "date<TAB>symbol<TAB>status" line per finished pair, appended per chunk
+CHECKPOINT_PATH = Path("data/store/backfill.checkpoint")
+CHUNK_SIZE = 25
+DEFAULT_WORKERS = snapshot.DEFAULT_WORKERS
+
+
+# ================= TASKS =================
+def archived_pairs(start=None, end=None, symbols=None, root=CACHE_PATH):
+    """Sorted (date, symbol) pairs with a cached chain inside [start, end]."""
+    root = Path(root)
+    if not root.exists():
+        return []
+
+    wanted = set(symbols) if symbols else None
+    pairs = []
+    for folder in sorted(p for p in root.iterdir() if p.is_dir()):
+        d = folder.name
+        if (start and d < str(start)) or (end and d > str(end)):
+            continue
+        for file in sorted(folder.glob("*.parquet")):
+            if wanted is None or file.stem in wanted:
+                pairs.append((d, file.stem))
+    return pairs
+
+
+def load_checkpoint(path=CHECKPOINT_PATH):
+    """{(date, symbol): status} of pairs finished by earlier runs."""
+    path = Path(path)
+    if not path.exists():
+        return {}
+
+    done = {}
+    for line in path.read_text().splitlines():
+        parts = line.split("\t")
+        if len(parts) == 3:
+            done[(parts[0], parts[1])] = parts[2]
+    return done
+
+
+def write_checkpoint(results, path=CHECKPOINT_PATH):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a") as f:
+        for r in results:
+            f.write(f"{r['date']}\t{r['symbol']}\t{r['status']}\n")
+        f.flush()
+
+
+# ================= WORKER =================
+def _run_chunk(pairs, ship_metrics=False):
+    """run() in replay mode for every (date, symbol) of one chunk."""
+    if ship_metrics:
+        instrument.collect()
+
+    rows, results, cubes = [], [], {}
+    for d, symbol in pairs:
+        try:
+            out = snapshot.run(symbol, replay=True, market_date=d, write=False, cubes=cubes)
+            status = "ok" if out is not None else "skipped"
+            if out is not None:
+                rows.append(out)
+        except Exception as e:
+            status = "failed"
+            print(f"[FAIL] {d} {symbol} — {type(e).__name__}: {e}")
+        results.append({"date": d, "symbol": symbol, "status": status})
+
+    return {
+        "results": results,
+        "rows": pd.concat(rows, ignore_index=True) if rows else None,
+        "cubes": cubes,
+        "metrics": instrument.collect() if ship_metrics else None,
+    }
+
+
+# ================= BACKFILL =================
+def backfill(start=None, end=None, symbols=None, workers=DEFAULT_WORKERS,
+             chunk_size=CHUNK_SIZE, checkpoint=CHECKPOINT_PATH, restart=False):
+    """
+    Recomputes snapshots for every archived (date, symbol) in range and
+    appends them to the snapshot store, chunk by chunk. After each chunk
+    its rows are stored first and its pairs checkpointed second, so an
+    interrupted run loses at most the chunks in flight and a re-run skips
+    everything already checkpointed (failed pairs are retried).
+    """
+    pairs = archived_pairs(start, end, symbols)
+    done = {} if restart else load_checkpoint(checkpoint)
+    if restart and Path(checkpoint).exists():
+        Path(checkpoint).unlink()
+
+    todo = [p for p in pairs if done.get(p) not in ("ok", "skipped")]
+    print(f"[BACKFILL] {len(pairs)} archived pairs | {len(pairs) - len(todo)} already done | {len(todo)} to run")
+    if not todo:
+        return pd.DataFrame(columns=["date", "symbol", "status"])
+
+    chunks = [todo[i:i + chunk_size] for i in range(0, len(todo), chunk_size)]
+    finished = []
+    started = time.perf_counter()
+
+    def commit(chunk_out):
+        with instrument.span("backfill.commit"):
+            if chunk_out["rows"] is not None:
+                snapshot_store.append(chunk_out["rows"])
+            snapshot.save_cube_batch(chunk_out["cubes"])
+            write_checkpoint(chunk_out["results"], checkpoint)
+        instrument.merge(chunk_out["metrics"])
+        for r in chunk_out["results"]:
+            instrument.count(f"backfill.{r['status']}")
+        finished.extend(chunk_out["results"])
+        print(f"[BACKFILL] {len(finished)}/{len(todo)} pairs | {time.perf_counter() - started:.1f}s")
+
+    if workers <= 1:
+        for chunk in chunks:
+            commit(_run_chunk(chunk))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_run_chunk, chunk, True) for chunk in chunks]
+            for fut in as_completed(futures):
+                commit(fut.result())
+
+    # one part per chunk was appended; merge them per date (this also
+    # picks up parts left behind by an interrupted earlier run)
+    for d in sorted({d for d, _ in pairs}):
+        if len(snapshot_store.part_files(d)) > 1:
+            snapshot_store.compact(d)
+
+    return pd.DataFrame(finished)
+
+
+# ================= ENTRY =================
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Resumable snapshot backfill from cached chains")
+    parser.add_argument("--start", help="first market date (YYYY-MM-DD, inclusive)")
+    parser.add_argument("--end", help="last market date (YYYY-MM-DD, inclusive)")
+    parser.add_argument("--symbols", nargs="*", help="symbols (default: every cached symbol)")
+    parser.add_argument("--symbols-file", help="file with the symbol universe")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="process pool size (1 = inline)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="(date, symbol) pairs per task")
+    parser.add_argument("--checkpoint", default=str(CHECKPOINT_PATH))
+    parser.add_argument("--restart", action="store_true", help="ignore and reset the checkpoint")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    symbols = None
+    if args.symbols or args.symbols_file:
+        symbols = snapshot.load_symbols(args.symbols, args.symbols_file)
+
+    summary = backfill(
+        start=args.start,
+        end=args.end,
+        symbols=symbols,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        checkpoint=args.checkpoint,
+        restart=args.restart,
+    )
+    if len(summary):
+        print(summary["status"].value_counts().to_string())
+    instrument.write_report(entry="backfill")
+
+    if len(summary) and (summary["status"] == "failed").all():
+        sys.exit(1)
@@ -0,0 +1,282 @@
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+import warnings
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import greeks
+import main
+import scenario
+from exposure_cube import GammaCube
+from option_chain import OptionChain
+
+# ================= CONFIG =================
+DEFAULT_SIZES = [100, 1_000, 10_000, 100_000]
+DEFAULT_OUT = Path("data/evaluation/benchmark.json")
+SPOT = 500.0
+
+# reference (scalar py_vollib) checks are O(200 x N) Python calls
+CHECK_SIZE = 300
+
+
+# ================= SYNTHETIC CHAINS =================
+def synthetic_options(n, spot=SPOT, seed=0):
+    """
+    n contracts in load_options layout. Strikes cluster around spot
+    (wider for longer DTE), DTE skews toward the short end like a
+    weekly/daily listing, IV follows a put-skewed smile with noise.
+    """
+    rng = np.random.default_rng(seed)
+
+    dte = np.minimum(rng.geometric(0.12, n), main.MAX_DTE)
+    t = dte / 365
+    log_m = rng.normal(0, 0.04 + 0.25 * np.sqrt(t), n)
+    strike = np.round(spot * np.exp(log_m))
+
+    z = log_m / np.sqrt(t)
+    iv = np.clip(0.18 * (1 + 0.08 * z * z - 0.12 * z) * rng.normal(1, 0.05, n), 0.02, 3.0)
+    oi = rng.lognormal(5, 1.5, n).round() + 1
+
+    return pd.DataFrame({
+        "strike": strike,
+        "oi": oi,
+        "iv": iv,
+        "dte": dte.astype("int64"),
+        "type": np.where(rng.random(n) < 0.5, "call", "put").astype(object),
+    })
+
+
+# ================= TIMING =================
+def measure(fn, repeat):
+    """(best seconds, peak traced bytes) over `repeat` calls of fn()."""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak, result
+
+
+def bench_size(n, repeat, seed):
+    chain = synthetic_options(n, seed=seed)
+    greeks_df = main.compute_greeks(chain.copy(), SPOT)
+    compact = OptionChain.from_frame(chain)
+
+    kernels = {
+        "compute_greeks": lambda: main.compute_greeks(chain.copy(), SPOT),
+        "compute_greeks[OptionChain]": lambda: main.compute_greeks(compact, SPOT),
+        "compute_gamma_profile": lambda: main.compute_gamma_profile(greeks_df, SPOT),
+        "gamma_cube": lambda: GammaCube.from_chain(greeks_df),
+        "scenario_surface": lambda: main.scenario_surface(greeks_df, SPOT),
+        "find_dnz": lambda: main.find_dnz(greeks_df, SPOT),
+        "compute_effective_gamma_pressure": lambda: main.compute_effective_gamma_pressure(greeks_df, SPOT),
+    }
+
+    rows = []
+    for name, fn in kernels.items():
+        seconds, peak, _ = measure(fn, repeat)
+        rows.append({
+            "kernel": name,
+            "contracts": n,
+            "seconds": seconds,
+            "contracts_per_sec": n / seconds if seconds else None,
+            "peak_bytes": peak,
+        })
+
+    dnz_low, dnz_mid, dnz_high = main.find_dnz(greeks_df, SPOT)
+    outputs = {
+        "contracts": n,
+        "dnz_low": float(dnz_low),
+        "dnz_mid": float(dnz_mid),
+        "dnz_high": float(dnz_high),
+        "egp": float(main.compute_effective_gamma_pressure(greeks_df, SPOT)),
+        "gamma_flip": float(main.compute_gamma_flip(greeks_df, SPOT)),
+        "gamma_total": float(greeks_df["gamma_exp"].sum()),
+        "frame_bytes": int(chain.memory_usage(deep=True).sum()),
+        "option_chain_bytes": int(OptionChain.from_frame(chain).nbytes),
+    }
+    return rows, outputs
+
+
+# ================= AGREEMENT =================
+def reference_greeks(df, spot):
+    """The original per-row py_vollib compute_greeks."""
+    from py_vollib.black_scholes.greeks.analytical import delta, gamma
+
+    deltas, gammas = [], []
+    for _, r in df.iterrows():
+        flag = "c" if r["type"] == "call" else "p"
+        try:
+            d = delta(flag, spot, r["strike"], r["dte"] / 365, main.RISK_FREE, r["iv"])
+            g = gamma(flag, spot, r["strike"], r["dte"] / 365, main.RISK_FREE, r["iv"])
+        except Exception:
+            d, g = 0.0, 0.0
+        w = main.dte_weight(r["dte"])
+        deltas.append(d * r["oi"] * w)
+        gammas.append(g * r["oi"] * w)
+    return np.array(deltas), np.array(gammas)
+
+
+def reference_dnz(df, spot):
+    """The original find_dnz: 200 prices x per-row py_vollib delta."""
+    from py_vollib.black_scholes.greeks.analytical import delta
+
+    prices = np.linspace(spot * 0.9, spot * 1.1, 200)
+    net_deltas = []
+    for p in prices:
+        total = 0.0
+        for _, r in df.iterrows():
+            flag = "c" if r["type"] == "call" else "p"
+            try:
+                d = delta(flag, p, r["strike"], r["dte"] / 365, main.RISK_FREE, r["iv"])
+            except Exception:
+                d = 0.0
+            total += d * r["oi"] * main.dte_weight(r["dte"])
+        net_deltas.append(total)
+
+    idx = np.argmin(np.abs(net_deltas))
+    dnz_mid = prices[idx]
+    width = (prices.max() - prices.min()) * 0.005
+    return dnz_mid - width, dnz_mid, dnz_mid + width
+
+
+def check_agreement(n=CHECK_SIZE, seed=0):
+    """Vectorized kernels vs the scalar py_vollib reference on one chain."""
+    chain = synthetic_options(n, seed=seed)
+    df = main.compute_greeks(chain.copy(), SPOT)
+
+    ref_delta, ref_gamma = reference_greeks(chain, SPOT)
+    ref_dnz = reference_dnz(chain, SPOT)
+    ref_egp = main.compute_effective_gamma_pressure(df, SPOT, method="finite_difference")
+
+    egp = {m: main.compute_effective_gamma_pressure(df, SPOT, method=m) for m in main.EGP_METHODS}
+    oi_w = chain["oi"].to_numpy() * greeks.dte_weights(chain["dte"])
+
+    # the path load_options -> run takes: greeks on an OptionChain
+    compact = main.compute_greeks(OptionChain.from_frame(chain), SPOT)
+
+    def delta_err(delta_exp):
+        return float(np.max(np.abs(delta_exp - ref_delta) / oi_w))
+
+    def gamma_err(gamma_exp):
+        return float(np.max(np.abs(gamma_exp - ref_gamma) / np.maximum(np.abs(ref_gamma), 1e-300)))
+
+    checks = {
+        "contracts": n,
+        "delta_max_abs_err": delta_err(df["delta_exp"].to_numpy()),
+        "gamma_max_rel_err": gamma_err(df["gamma_exp"].to_numpy()),
+        "chain_delta_max_abs_err": delta_err(compact.delta_exp),
+        "chain_gamma_max_rel_err": gamma_err(compact.gamma_exp),
+        "dnz_equal": bool(np.allclose(main.find_dnz(df, SPOT), ref_dnz, rtol=0, atol=1e-9)),
+        "egp_rel_err": {
+            m: float(abs(v - ref_egp) / ref_egp) if ref_egp else 0.0 for m, v in egp.items()
+        },
+    }
+    checks["ok"] = (
+        checks["delta_max_abs_err"] <= scenario.GREEKS_TOLERANCE
+        and checks["gamma_max_rel_err"] <= scenario.GREEKS_TOLERANCE
+        and checks["chain_delta_max_abs_err"] <= scenario.GREEKS_TOLERANCE
+        and checks["chain_gamma_max_rel_err"] <= scenario.GREEKS_TOLERANCE
+        and checks["dnz_equal"]
+        and checks["egp_rel_err"]["batched"] <= 1e-9
+    )
+    return checks
+
+
+# ================= BASELINE COMPARISON =================
+def compare_to_baseline(result, baseline_path):
+    baseline = json.loads(Path(baseline_path).read_text())
+
+    old = {(r["kernel"], r["contracts"]): r["seconds"] for r in baseline.get("timings", [])}
+    speedups = [
+        {
+            "kernel": r["kernel"],
+            "contracts": r["contracts"],
+            "speedup": old[(r["kernel"], r["contracts"])] / r["seconds"],
+        }
+        for r in result["timings"]
+        if (r["kernel"], r["contracts"]) in old and r["seconds"]
+    ]
+
+    old_out = {o["contracts"]: o for o in baseline.get("outputs", [])}
+    drift = []
+    for o in result["outputs"]:
+        prev = old_out.get(o["contracts"])
+        if prev is None:
+            continue
+        for key in ("dnz_low", "dnz_mid", "dnz_high", "egp", "gamma_total"):
+            if not np.isclose(o[key], prev[key], rtol=1e-9, atol=1e-12):
+                drift.append({"contracts": o["contracts"], "metric": key, "was": prev[key], "now": o[key]})
+
+    return {"baseline": str(baseline_path), "speedups": speedups, "output_drift": drift}
+
+
+# ================= ENTRY =================
+def run_benchmark(sizes=DEFAULT_SIZES, repeat=3, seed=0, check=True):
+    timings, outputs = [], []
+    for n in sizes:
+        rows, out = bench_size(n, repeat, seed)
+        timings += rows
+        outputs.append(out)
+        for r in rows:
+            print(f"[BENCH] {r['kernel']:<34} n={n:>7}  {r['seconds'] * 1e3:9.2f} ms  "
+                  f"peak {r['peak_bytes'] / 2**20:8.2f} MiB")
+
+    result = {
+        "created_at_utc": datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "seed": seed,
+        "repeat": repeat,
+        "timings": timings,
+        "outputs": outputs,
+    }
+    if check:
+        result["agreement"] = check_agreement(seed=seed)
+        print(f"[CHECK] agreement with py_vollib reference: "
+              f"{'OK' if result['agreement']['ok'] else 'FAILED'}")
+    return result
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the gamma compute kernels")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=str(DEFAULT_OUT))
+    parser.add_argument("--baseline", help="previous benchmark JSON to compare against")
+    parser.add_argument("--no-check", action="store_true", help="skip the py_vollib agreement check")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    warnings.filterwarnings("ignore", category=DeprecationWarning)
+    args = parse_args()
+
+    result = run_benchmark(args.sizes, repeat=args.repeat, seed=args.seed, check=not args.no_check)
+    if args.baseline:
+        result["comparison"] = compare_to_baseline(result, args.baseline)
+        for d in result["comparison"]["output_drift"]:
+            print(f"[DRIFT] n={d['contracts']} {d['metric']}: {d['was']} -> {d['now']}")
+
+    out = Path(args.out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(result, indent=2))
+    print(f"[OK] Benchmark written to {out}")
+
+    if "agreement" in result and not result["agreement"]["ok"]:
+        sys.exit(1)
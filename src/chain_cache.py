@@ -0,0 +1,59 @@
+import pandas as pd
+from pathlib import Path
+
+from option_chain import OptionChain
+
+# ================= CONFIG =================
+# data/cache/chains/{market_date}/{symbol}.parquet
+# Not committed (.gitignore); in CI the daily workflow carries data/cache
+# from run to run with actions/cache. Elsewhere --replay and backfill only
+# see the days this machine has cached itself.
+CACHE_PATH = Path("data/cache/chains")
+
+CHAIN_COLUMNS = ["strike", "oi", "iv", "dte", "type"]
+
+
+# ================= PATHS =================
+def cache_path(symbol, market_date, root=CACHE_PATH):
+    return Path(root) / market_date / f"{symbol}.parquet"
+
+
+def cached_dates(symbol, root=CACHE_PATH):
+    """Sorted market dates that have a cached chain for `symbol`."""
+    root = Path(root)
+    if not root.exists():
+        return []
+    return sorted(p.parent.name for p in root.glob(f"*/{symbol}.parquet"))
+
+
+# ================= SAVE / LOAD =================
+def save_chain(symbol, market_date, options_df, spot, root=CACHE_PATH):
+    """
+    Chain from load_options (OptionChain or frame) plus the spot used for
+    it, in the OptionChain dtypes. Spot is kept as a constant column —
+    parquet run-length encodes it away.
+    """
+    path = cache_path(symbol, market_date, root)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    df = OptionChain.from_frame(options_df).to_frame()[CHAIN_COLUMNS]
+    df["spot"] = float(spot)
+
+    tmp = path.with_suffix(".tmp")
+    df.to_parquet(tmp, index=False, compression="zstd")
+    tmp.replace(path)
+    return path
+
+
+def load_chain(symbol, market_date, root=CACHE_PATH):
+    """(OptionChain, spot) for a cached (symbol, market_date), or None."""
+    path = cache_path(symbol, market_date, root)
+    if not path.exists():
+        return None
+
+    df = pd.read_parquet(path)
+    if df.empty:
+        return None
+
+    spot = float(df["spot"].iloc[0])
+    return OptionChain.from_frame(df), spot
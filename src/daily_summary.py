@@ -1,50 +1,156 @@
+import argparse
+import json
+import numpy as np
 import pandas as pd
 from pathlib import Path
 
-DATA_PATH = Path("data/snapshots")
+import snapshot_store
 
-def structure_tags(row):
-    tags = []
+# ================= CONFIG =================
+# {"parts": {date: [part files scanned]}, "latest": {symbol: date}}
+INDEX_PATH = Path("data/store/latest_snapshots.json")
+
+EGP_HIGH = 1e-4
+GAMMA_BALANCE_EPS = 1e-6
+
+
+# ================= LATEST-SNAPSHOT INDEX =================
+def _parts_symbols(parts):
+    if not parts:
+        return set()
+    return set(pd.concat([pd.read_parquet(p, columns=["symbol"]) for p in parts])["symbol"].astype(str))
+
+
+def latest_index(root=snapshot_store.STORE_PATH, path=INDEX_PATH):
+    """
+    {symbol: date of its latest snapshot}. Persisted with the part files
+    it has read, so an update only reads the symbol column of parts that
+    are new — in any partition, including an older date written later
+    by a backfill. Rebuilt from scratch if an indexed partition
+    disappeared.
+    """
+    path = Path(path)
+    dates = snapshot_store.partitions(root)
+    index = json.loads(path.read_text()) if path.exists() else {}
+
+    if "parts" not in index or not set(index["latest"].values()) <= set(dates):
+        index = {"parts": {}, "latest": {}}
+
+    changed = not path.exists()
+    for d in [d for d in index["parts"] if d not in dates]:
+        del index["parts"][d]
+        changed = True
+
+    for d in dates:
+        parts = {p.name: p for p in snapshot_store.part_files(d, root)}
+        seen = set(index["parts"].get(d, []))
+        new = [parts[name] for name in sorted(set(parts) - seen)]
+        if not new and seen <= set(parts):
+            continue
+
+        for s in _parts_symbols(new):
+            if index["latest"].get(s, "") < d:
+                index["latest"][s] = d
+        # compacted-away parts drop out; their symbols live on in the new part
+        index["parts"][d] = sorted(parts)
+        changed = True
+
+    if changed:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.tmp")
+        tmp.write_text(json.dumps(index, indent=1, sort_keys=True))
+        tmp.replace(path)
+
+    return index["latest"]
 
-    # --- DNZ position ---
-    if row["spot"] > row["dnz_high"]:
-        tags.append("break_above_dnz")
-    elif row["spot"] < row["dnz_low"]:
-        tags.append("break_below_dnz")
-    else:
-        tags.append("inside_dnz")
 
-    # --- Gamma asymmetry ---
-    if abs(row["gamma_above"] - row["gamma_below"]) < 1e-6:
-        tags.append("gamma_balanced")
-    elif row["gamma_above"] > row["gamma_below"]:
-        tags.append("gamma_asym_up")
-    else:
-        tags.append("gamma_asym_down")
+def load_latest(symbols=None, root=snapshot_store.STORE_PATH, path=INDEX_PATH):
+    """Latest snapshot row of every symbol (or of `symbols`), one partition read per distinct date."""
+    latest = latest_index(root, path)
+    if symbols is not None:
+        latest = {s: latest[s] for s in symbols if s in latest}
+    if not latest:
+        return pd.DataFrame(columns=snapshot_store.KEY)
 
-    # --- Effective Gamma Pressure ---
-    egp = row.get("effective_gamma_pressure", 0)
+    by_date = {}
+    for s, d in latest.items():
+        by_date.setdefault(d, []).append(s)
+    frames = [
+        snapshot_store.read(symbols=syms, start=d, end=d, root=root)
+        for d, syms in sorted(by_date.items())
+    ]
 
-    if egp > 1e-4:
-        tags.append("high_egp")
-    else:
-        tags.append("low_egp")
+    return pd.concat(frames, ignore_index=True).sort_values("symbol", ignore_index=True)
 
-    return " | ".join(tags)
+
+# ================= TAGS =================
+def tag_columns(df):
+    """DNZ position / gamma asymmetry / EGP tags as columns (NaN compares False, like the row version)."""
+    spot = df["spot"].to_numpy(dtype=float)
+    above = df["gamma_above"].to_numpy(dtype=float)
+    below = df["gamma_below"].to_numpy(dtype=float)
+    egp = (
+        df["effective_gamma_pressure"].to_numpy(dtype=float)
+        if "effective_gamma_pressure" in df.columns
+        else np.zeros(len(df))
+    )
+
+    with np.errstate(invalid="ignore"):
+        dnz_position = np.select(
+            [spot > df["dnz_high"].to_numpy(dtype=float), spot < df["dnz_low"].to_numpy(dtype=float)],
+            ["break_above_dnz", "break_below_dnz"],
+            "inside_dnz",
+        )
+        gamma_asymmetry = np.select(
+            [np.abs(above - below) < GAMMA_BALANCE_EPS, above > below],
+            ["gamma_balanced", "gamma_asym_up"],
+            "gamma_asym_down",
+        )
+        egp_level = np.where(egp > EGP_HIGH, "high_egp", "low_egp")
+
+    tags = pd.DataFrame(
+        {"dnz_position": dnz_position, "gamma_asymmetry": gamma_asymmetry, "egp_level": egp_level},
+        index=df.index,
+    )
+    tags["structure_tags"] = tags["dnz_position"] + " | " + tags["gamma_asymmetry"] + " | " + tags["egp_level"]
+    return tags
+
+
+def structure_tags(row):
+    return tag_columns(pd.DataFrame([row]))["structure_tags"].iloc[0]
+
+
+# ================= SUMMARY =================
+def summarize(symbols=None, root=snapshot_store.STORE_PATH, path=INDEX_PATH):
+    """Cross-symbol summary table: latest snapshot of each symbol plus its tags."""
+    df = load_latest(symbols, root, path)
+    if df.empty:
+        return pd.DataFrame(columns=["date", "symbol", "dnz_position", "gamma_asymmetry", "egp_level", "structure_tags"])
+
+    return pd.concat([df[["date", "symbol"]], tag_columns(df)], axis=1)
 
 
 def summarize_symbol(symbol):
-    files = sorted(DATA_PATH.glob(f"*_{symbol}.csv"))
-    if not files:
+    out = summarize([symbol])
+    if out.empty:
         return None
 
-    df_today = pd.read_csv(files[-1])
-    row = df_today.iloc[0]
-
+    row = out.iloc[0]
     return {
         "date": row["date"],
         "symbol": symbol,
-        "structure_tags": structure_tags(row),
-    }  
+        "structure_tags": row["structure_tags"],
+    }
+
 
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Latest structure tags for every symbol in the store")
+    parser.add_argument("--symbols", nargs="*", help="restrict to these symbols")
+    parser.add_argument("--out", help="also write the table to this CSV")
+    args = parser.parse_args()
 
+    summary = summarize(args.symbols)
+    print(summary.to_string(index=False))
+    if args.out:
+        summary.to_csv(args.out, index=False)
+        print(f"[OK] Summary written to {args.out}")
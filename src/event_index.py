@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+# ================= CONFIG =================
+CALENDAR_PATH = Path("data/calendars")
+
+# on a shared date the later file wins (same order the old dict was built in);
+# any other *.csv in the folder follows alphabetically
+EVENT_FILES = ["fomc.csv", "cpi.csv", "opex.csv"]
+
+
+# ================= INDEX =================
+class EventIndex:
+    """
+    Sorted array of event dates (one type per date) built once from
+    data/calendars/*.csv. Every lookup is a searchsorted over that array,
+    so resolving a whole frame is O(rows * log events).
+    """
+
+    def __init__(self, dates, types):
+        self.dates = np.asarray(dates, dtype="datetime64[D]")
+        self.types = np.asarray(types, dtype=object)
+
+    @classmethod
+    def from_calendars(cls, path=CALENDAR_PATH):
+        path = Path(path)
+        files = [path / f for f in EVENT_FILES if (path / f).exists()]
+        files += sorted(p for p in path.glob("*.csv") if p.name not in EVENT_FILES)
+
+        frames = []
+        for file in files:
+            df = pd.read_csv(file, usecols=["date", "event"])
+            frames.append(df)
+
+        if not frames:
+            return cls([], [])
+
+        events = pd.concat(frames, ignore_index=True)
+        events["date"] = pd.to_datetime(events["date"], errors="coerce")
+        events = (
+            events.dropna(subset=["date"])
+            .drop_duplicates(subset="date", keep="last")
+            .sort_values("date")
+        )
+        return cls(events["date"].to_numpy(dtype="datetime64[D]"), events["event"].astype(str).to_numpy())
+
+    def __len__(self):
+        return len(self.dates)
+
+    def resolve(self, dates):
+        """
+        is_event_day, event_type, event_phase, days_to_next_event and
+        days_since_prev_event for every entry of `dates` (calendar days;
+        0 on the event day itself, NaN when there is no such event).
+        """
+        index = dates.index if isinstance(dates, pd.Series) else None
+        d = pd.to_datetime(pd.Series(dates, index=index), errors="coerce")
+        valid = d.notna().to_numpy()
+        d = d.to_numpy(dtype="datetime64[D]")
+        n = len(self.dates)
+
+        out = pd.DataFrame(index=index if index is not None else pd.RangeIndex(len(d)))
+        out["is_event_day"] = False
+        out["event_type"] = "NONE"
+        out["event_phase"] = "NONE"
+        out["days_to_next_event"] = np.nan
+        out["days_since_prev_event"] = np.nan
+        if not n:
+            return out
+
+        nxt = np.searchsorted(self.dates, d, side="left")
+        prev = np.searchsorted(self.dates, d, side="right") - 1
+
+        has_next = valid & (nxt < n)
+        has_prev = valid & (prev >= 0)
+        next_date = self.dates[np.minimum(nxt, n - 1)]
+        prev_date = self.dates[np.maximum(prev, 0)]
+        is_event = has_next & (next_date == d)
+
+        out["is_event_day"] = is_event
+        out["event_type"] = np.where(is_event, self.types[np.minimum(nxt, n - 1)], "NONE")
+        out["event_phase"] = np.select(
+            [~valid, is_event, has_next],
+            ["NONE", "EVENT", "PRE_EVENT"],
+            default="POST_EVENT",
+        )
+        out["days_to_next_event"] = np.where(
+            has_next, (next_date - d).astype("timedelta64[D]").astype(float), np.nan
+        )
+        out["days_since_prev_event"] = np.where(
+            has_prev, (d - prev_date).astype("timedelta64[D]").astype(float), np.nan
+        )
+        return out
+
+    def annotate(self, df, date_col="date"):
+        """Adds the resolve() columns to `df` in place and returns it."""
+        resolved = self.resolve(df[date_col])
+        for col in resolved.columns:
+            df[col] = resolved[col].to_numpy()
+        return df
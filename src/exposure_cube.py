@@ -0,0 +1,180 @@
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+from option_chain import OptionChain
+
+# ================= CONFIG =================
+# data/store/cubes/date=YYYY-MM-DD.npz — every symbol's cube of one market
+# date in one file (<SYMBOL>/strikes, <SYMBOL>/dte, <SYMBOL>/gamma,
+# <SYMBOL>/spot), next to the snapshot store
+CUBE_PATH = Path("data/store/cubes")
+
+SIDES = ("call", "put")
+TOP_STRIKES = 3
+
+
+# ================= STRIKE VIEWS =================
+# `per_strike` = total gamma per entry of the sorted `strikes` array.
+def strike_split(strikes, per_strike, spot):
+    above = per_strike[np.searchsorted(strikes, spot, side="right"):].sum()
+    below = per_strike[:np.searchsorted(strikes, spot, side="left")].sum()
+    return above, below
+
+
+def strike_profile(strikes, per_strike, spot):
+    if not len(strikes):
+        return {
+            "gamma_peak_price": np.nan,
+            "gamma_concentration": 0.0,
+            "gamma_distance_from_spot": 0.0,
+        }
+
+    strength = np.abs(per_strike)
+    peak = strikes[np.argmax(strength)]
+    total = strength.sum()
+    top = np.sort(strength)[-TOP_STRIKES:].sum()
+
+    return {
+        "gamma_peak_price": peak,
+        "gamma_concentration": top / total if total else 0.0,
+        "gamma_distance_from_spot": (peak - spot) / spot,
+    }
+
+
+# ================= CUBE =================
+class GammaCube:
+    """
+    Gamma exposure (gamma_exp = gamma * oi * dte_weight) summed into a
+    dense strike x expiry x side array. Built in one bincount pass over
+    the greeks output; every gamma view of the snapshot (peak,
+    concentration, above/below spot, term structure) is a reduction of
+    this array, so the chain is never re-scanned or re-grouped.
+
+    strikes — sorted unique strikes, shape (K,)
+    dte     — sorted unique days to expiry, shape (E,)
+    gamma   — float64, shape (K, E, 2); last axis = SIDES
+    """
+
+    def __init__(self, strikes, dte, gamma):
+        self.strikes = np.asarray(strikes, dtype=np.float64)
+        self.dte = np.asarray(dte, dtype=np.int64)
+        self.gamma = np.asarray(gamma, dtype=np.float64).reshape(len(self.strikes), len(self.dte), len(SIDES))
+
+    @classmethod
+    def from_chain(cls, chain):
+        """From a compute_greeks() OptionChain or frame (strike, dte, type, gamma_exp)."""
+        if isinstance(chain, OptionChain):
+            strike = chain.strike.astype(np.float64)
+            gamma = chain.gamma_exp
+            dte = chain.dte.astype(np.int64)
+            put = ~chain.is_call
+        else:
+            strike = chain["strike"].to_numpy(dtype=np.float64)
+            gamma = chain["gamma_exp"].to_numpy(dtype=np.float64)
+            dte = chain["dte"].to_numpy(dtype=np.int64)
+            put = (chain["type"] != "call").to_numpy()
+        ok = np.isfinite(strike) & np.isfinite(gamma)
+
+        strikes, k = np.unique(strike[ok], return_inverse=True)
+        dte, e = np.unique(dte[ok], return_inverse=True)
+        side = put[ok].astype(np.int64)
+
+        cells = (k * len(dte) + e) * len(SIDES) + side
+        size = len(strikes) * len(dte) * len(SIDES)
+        return cls(strikes, dte, np.bincount(cells, weights=gamma[ok], minlength=size))
+
+    def __len__(self):
+        return len(self.strikes)
+
+    # ---------- views ----------
+    def by_strike(self):
+        """Total gamma per strike (the old groupby("strike") sum)."""
+        return self.gamma.sum(axis=(1, 2))
+
+    def split(self, spot):
+        """(gamma above spot, gamma below spot); strikes equal to spot count in neither."""
+        return strike_split(self.strikes, self.by_strike(), spot)
+
+    def profile(self, spot):
+        """gamma_peak_price, gamma_concentration and gamma_distance_from_spot."""
+        return strike_profile(self.strikes, self.by_strike(), spot)
+
+    def term_structure(self, spot=None):
+        """Per-expiry call / put / total gamma (plus above / below when spot is given)."""
+        by_expiry = self.gamma.sum(axis=0)
+        out = pd.DataFrame({
+            "dte": self.dte,
+            "call_gamma": by_expiry[:, 0],
+            "put_gamma": by_expiry[:, 1],
+            "gamma_total": by_expiry.sum(axis=1),
+        })
+
+        if spot is not None:
+            hi = np.searchsorted(self.strikes, spot, side="right")
+            lo = np.searchsorted(self.strikes, spot, side="left")
+            per_expiry = self.gamma.sum(axis=2)
+            out["gamma_above"] = per_expiry[hi:].sum(axis=0)
+            out["gamma_below"] = per_expiry[:lo].sum(axis=0)
+
+        return out
+
+    def arrays(self, spot):
+        return {"strikes": self.strikes, "dte": self.dte, "gamma": self.gamma, "spot": np.float64(spot)}
+
+
+# ================= STORE =================
+def cube_path(market_date, root=CUBE_PATH):
+    return Path(root) / f"date={market_date}.npz"
+
+
+def _read_partition(path):
+    """{symbol: {field: array}} of one date file."""
+    out = {}
+    with np.load(path) as data:
+        for key in data.files:
+            symbol, field = key.rsplit("/", 1)
+            out.setdefault(symbol, {})[field] = data[key]
+    return out
+
+
+def save_cubes(cubes, market_date, root=CUBE_PATH):
+    """
+    Write {symbol: (cube, spot)} into the date's file in one rewrite;
+    symbols already stored for that date are kept unless replaced.
+    """
+    if not cubes:
+        return None
+    path = cube_path(market_date, root)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    stored = _read_partition(path) if path.exists() else {}
+    for symbol, (cube, spot) in cubes.items():
+        stored[symbol] = cube.arrays(spot)
+
+    arrays = {f"{symbol}/{field}": a for symbol, fields in stored.items() for field, a in fields.items()}
+    tmp = path.with_name(f".{path.name}.tmp")
+    with open(tmp, "wb") as f:
+        np.savez_compressed(f, **arrays)
+    tmp.replace(path)
+    return path
+
+
+def save_cube(cube, market_date, symbol, spot, root=CUBE_PATH):
+    return save_cubes({symbol: (cube, spot)}, market_date, root)
+
+
+def load_cubes(market_date, root=CUBE_PATH):
+    """{symbol: GammaCube} of one market date ({} if none was saved)."""
+    path = cube_path(market_date, root)
+    if not path.exists():
+        return {}
+    return {
+        symbol: GammaCube(f["strikes"], f["dte"], f["gamma"])
+        for symbol, f in _read_partition(path).items()
+    }
+
+
+def load_cube(market_date, symbol, root=CUBE_PATH):
+    """The persisted cube of one snapshot, or None."""
+    return load_cubes(market_date, root).get(symbol)
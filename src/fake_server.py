@@ -0,0 +1,161 @@
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import netio
+
+# ================= FAKE SERVER =================
+# Local stand-in for a throttling API: every GET sleeps a random latency
+# and, with probability throttle_rate (or above max_rps), answers 429
+# with a Retry-After header. Tracks peak concurrency so the netio limits
+# can be checked from the outside.
+
+
+class FakeServer:
+    def __init__(self, latency=(0.02, 0.1), throttle_rate=0.2, max_rps=None,
+                 retry_after=0.2, error_rate=0.0, seed=0):
+        self.latency = latency
+        self.throttle_rate = throttle_rate
+        self.max_rps = max_rps
+        self.retry_after = retry_after
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.peak = 0
+        self.requests = 0
+        self.throttled = 0
+        self.errors = 0
+        self.recent = []
+        self.httpd = None
+
+    def _decide(self):
+        """(status, latency) for one request."""
+        with self.lock:
+            self.requests += 1
+            now = time.monotonic()
+            self.recent = [t for t in self.recent if now - t < 1.0] + [now]
+            roll = self.rng.random()
+            latency = self.rng.uniform(*self.latency)
+
+            if (self.max_rps and len(self.recent) > self.max_rps) or roll < self.throttle_rate:
+                self.throttled += 1
+                return 429, latency
+            if roll < self.throttle_rate + self.error_rate:
+                self.errors += 1
+                return 503, latency
+            return 200, latency
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with server.lock:
+                    server.in_flight += 1
+                    server.peak = max(server.peak, server.in_flight)
+                try:
+                    status, latency = server._decide()
+                    time.sleep(latency)
+                    body = json.dumps({"path": self.path, "status": status}).encode()
+
+                    self.send_response(status)
+                    if status == 429:
+                        self.send_header("Retry-After", str(server.retry_after))
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                finally:
+                    with server.lock:
+                        server.in_flight -= 1
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+# ================= CHECK =================
+def check(requests=60, concurrency=4, rate=20.0, burst=5, throttle_rate=0.2, error_rate=0.05, seed=0):
+    """
+    Drive netio against the fake server: every request must end 200 despite
+    injected 429 / 503s, and the server must never see more than
+    `concurrency` requests in flight.
+    """
+    policy = netio.HostPolicy(concurrency=concurrency, rate=rate, burst=burst,
+                              max_attempts=10, backoff_base=0.05, backoff_cap=1.0)
+    fetcher = netio.AsyncFetcher({"fake": policy}, rng=random.Random(seed))
+
+    with FakeServer(throttle_rate=throttle_rate, error_rate=error_rate, seed=seed) as server:
+        start = time.perf_counter()
+        results = netio.run(fetcher.gather(
+            "fake",
+            [(netio.http_get, f"{server.url}/item/{i}") for i in range(requests)],
+            return_exceptions=True,
+        ))
+        elapsed = time.perf_counter() - start
+
+    failed = [r for r in results if isinstance(r, Exception)]
+    report = {
+        "requests": requests,
+        "ok": requests - len(failed),
+        "failed": len(failed),
+        "server_requests": server.requests,
+        "server_throttled": server.throttled,
+        "server_errors": server.errors,
+        "peak_in_flight": server.peak,
+        "seconds": round(elapsed, 2),
+        "fetcher": fetcher.stats["fake"],
+    }
+    report["passed"] = not failed and server.peak <= concurrency
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="netio check against a local throttling server")
+    parser.add_argument("--requests", type=int, default=60)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--rate", type=float, default=20.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.2)
+    parser.add_argument("--error-rate", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    report = check(
+        requests=args.requests,
+        concurrency=args.concurrency,
+        rate=args.rate,
+        throttle_rate=args.throttle_rate,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    )
+    print(json.dumps(report, indent=2))
+    print(f"[CHECK] netio against fake server: {'OK' if report['passed'] else 'FAILED'}")
+    if not report["passed"]:
+        sys.exit(1)
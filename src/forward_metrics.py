@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+
+from trading_calendar import get_calendar
+
+# ================= CONFIG =================
+HORIZONS = [1, 2, 5]
+
+
+def forward_columns(horizons=HORIZONS):
+    cols = []
+    for n in horizons:
+        cols += [f"close_t+{n}", f"ret_t+{n}", f"days_to_close_t+{n}"]
+    return cols
+
+
+def _is_empty(series):
+    return series.isna() | series.isin(["", None])
+
+
+# ================= FORWARD RETURNS =================
+def fill_forward_returns(df, horizons=HORIZONS, calendar=None):
+    """
+    Fills close_t+n / ret_t+n / days_to_close_t+n from the same symbol's
+    snapshot exactly n trading sessions later. A missing snapshot leaves
+    the horizon empty instead of borrowing a later row. `df` must be
+    sorted by (symbol, date) with a numeric `spot`. Only cells that are
+    still empty are touched, and only rows with at least one empty cell
+    are looked up, so the cost follows the number of pending rows.
+    """
+    calendar = calendar or get_calendar()
+
+    for col in forward_columns(horizons):
+        if col not in df.columns:
+            df[col] = ""
+
+    spot = df["spot"].to_numpy(dtype=np.float64)
+    symbol = pd.factorize(df["symbol"], sort=True)[0].astype(np.int64)
+    dates = pd.to_datetime(df["date"], errors="coerce").to_numpy(dtype="datetime64[D]")
+
+    # (symbol, date) as one sortable int key; df order == key order
+    day = dates.astype(np.int64)
+    keys = symbol * 1_000_000 + day
+
+    for n in horizons:
+        cols = {
+            "close": f"close_t+{n}",
+            "ret": f"ret_t+{n}",
+            "days": f"days_to_close_t+{n}",
+        }
+        empty = {k: _is_empty(df[c]).to_numpy() for k, c in cols.items()}
+        pending = np.flatnonzero(
+            (empty["close"] | empty["ret"] | empty["days"]) & ~np.isnat(dates)
+        )
+        if not len(pending):
+            continue
+
+        target = calendar.session_offset(dates[pending], n)
+        ok = ~np.isnat(target)
+        pending, target = pending[ok], target[ok]
+
+        wanted = symbol[pending] * 1_000_000 + target.astype(np.int64)
+        future = np.searchsorted(keys, wanted)
+        future = np.minimum(future, len(keys) - 1)
+        ok = keys[future] == wanted
+        pending, future = pending[ok], future[ok]
+        if not len(pending):
+            continue
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            values = {
+                "close": spot[future],
+                "ret": spot[future] / spot[pending] - 1,
+                "days": np.full(len(pending), n),
+            }
+
+        for key, col in cols.items():
+            rows = pending[empty[key][pending]]
+            if not len(rows):
+                continue
+            if df[col].dtype != object:
+                df[col] = df[col].astype(object)
+            df.iloc[rows, df.columns.get_loc(col)] = values[key][empty[key][pending]]
+
+    return df
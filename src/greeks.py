@@ -0,0 +1,52 @@
+import numpy as np
+
+from option_chain import OptionChain
+
+# ================= CHAIN INPUTS =================
+# Array inputs of the Black-Scholes engine (scenario.ChainScenario), which
+# replaced the per-contract py_vollib calls.
+SQRT_2PI = np.sqrt(2 * np.pi)
+
+
+def valid_inputs(spot, strike, t, iv):
+    """
+    Mask of contracts py_vollib can price. Everything else is mapped
+    to 0, the same way the old per-row except branch did.
+    """
+    with np.errstate(invalid="ignore"):
+        return (
+            np.isfinite(spot) & np.isfinite(strike)
+            & np.isfinite(t) & np.isfinite(iv)
+            & (spot > 0) & (strike > 0) & (t > 0) & (iv > 0)
+        )
+
+
+def dte_weights(dte):
+    """Vectorized main.dte_weight: 1 / sqrt(max(dte, 1))."""
+    dte = np.asarray(dte, dtype=np.float64)
+    return 1 / np.sqrt(np.maximum(dte, 1))
+
+
+def chain_arrays(chain):
+    """
+    (is_call, strike, t, iv, oi * weight) as float64 NumPy arrays, from an
+    OptionChain or a chain DataFrame.
+    """
+    if isinstance(chain, OptionChain):
+        dte = chain.dte.astype(np.float64)
+        return (
+            chain.is_call,
+            chain.strike.astype(np.float64),
+            dte / 365,
+            chain.iv.astype(np.float64),
+            chain.oi * dte_weights(dte),
+        )
+
+    dte = chain["dte"].to_numpy(dtype=np.float64)
+    return (
+        (chain["type"] == "call").to_numpy(),
+        chain["strike"].to_numpy(dtype=np.float64),
+        dte / 365,
+        chain["iv"].to_numpy(dtype=np.float64),
+        chain["oi"].to_numpy(dtype=np.float64) * dte_weights(dte),
+    )
@@ -0,0 +1,143 @@
+import hashlib
+import json
+import pandas as pd
+from pathlib import Path
+
+import snapshot_store
+
+# ================= CONFIG =================
+# What the RAW append stage has already ingested from the snapshot store,
+# per storage target (StorageBackend.target: a sheet, a SQLite file, ...):
+#   files: store part path -> size / mtime_ns / blake2b / date / symbols
+#   keys:  date -> symbols ingested for it (kept after compaction deletes
+#          the part files they came from)
+MANIFEST_PATH = Path("data/store/ingest_manifest.json")
+HASH_CHUNK = 1 << 20
+
+
+# ================= LOAD / SAVE =================
+def load(target, path=MANIFEST_PATH):
+    """
+    The whole manifest file, with an entry for `target` created if the
+    append never ran against it. Manifests from before per-target
+    scoping are dropped (one full rescan, deduped by the storage).
+    """
+    path = Path(path)
+    manifest = json.loads(path.read_text()) if path.exists() else {}
+    if "targets" not in manifest:
+        manifest = {"targets": {}}
+    manifest["targets"].setdefault(target, {"files": {}, "keys": {}})
+    return manifest
+
+
+def scoped(manifest, target):
+    return manifest["targets"][target]
+
+
+def save(manifest, path=MANIFEST_PATH):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_text(json.dumps(manifest, indent=1, sort_keys=True))
+    tmp.replace(path)
+
+
+# ================= FILES =================
+def file_hash(path):
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_CHUNK), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def pending(manifest, root=snapshot_store.STORE_PATH):
+    """
+    Store part files that are new or changed since they were ingested
+    into one target (a scoped() manifest): [{path, date, size, mtime_ns,
+    hash}]. Unchanged size + mtime skips the file without opening it; a
+    changed stat is confirmed by hash. Entries of deleted parts
+    (compaction) are dropped from the manifest.
+    """
+    files = manifest["files"]
+    seen, out = set(), []
+
+    for d in snapshot_store.partitions(root):
+        for p in snapshot_store.part_files(d, root):
+            name = p.as_posix()
+            seen.add(name)
+            st = p.stat()
+            entry = files.get(name)
+            if entry and entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns:
+                continue
+
+            digest = file_hash(p)
+            if entry and entry["hash"] == digest:
+                entry["mtime_ns"] = st.st_mtime_ns
+                continue
+
+            out.append({"path": p, "date": d, "size": st.st_size,
+                        "mtime_ns": st.st_mtime_ns, "hash": digest})
+
+    for name in [n for n in files if n not in seen]:
+        del files[name]
+
+    return out
+
+
+def ingested_keys(manifest):
+    return {(d, s) for d, symbols in manifest["keys"].items() for s in symbols}
+
+
+def verify(manifest, existing_keys):
+    """
+    Forget everything recorded for a target that no longer holds the
+    keys it was given (sheet reset, SQLite file replaced), so its files
+    are read again. Returns True when the manifest was reset.
+    """
+    if ingested_keys(manifest) <= existing_keys:
+        return False
+    manifest["files"].clear()
+    manifest["keys"].clear()
+    return True
+
+
+# ================= READ =================
+def read_new_rows(files, existing_keys):
+    """
+    Snapshot rows of `files` whose (date, symbol) is not in
+    `existing_keys` (the storage's own keys, not the manifest's).
+    Only the symbol column is read first; a file whose symbols are all
+    stored (e.g. a compacted part) is not read any further.
+    """
+    frames = []
+    for d in sorted({f["date"] for f in files}):
+        parts = [f for f in files if f["date"] == d]
+        for f in parts:
+            f["symbols"] = sorted(set(pd.read_parquet(f["path"], columns=["symbol"])["symbol"].astype(str)))
+
+        fresh = [f["path"] for f in parts if any((d, s) not in existing_keys for s in f["symbols"])]
+        if not fresh:
+            continue
+
+        df = snapshot_store._read_parts(d, fresh)
+        frames.append(df[[(d, s) not in existing_keys for s in df["symbol"].astype(str)]])
+
+    if not frames:
+        return pd.DataFrame(columns=snapshot_store.KEY)
+    return pd.concat(frames, ignore_index=True).sort_values(snapshot_store.KEY, ignore_index=True)
+
+
+def record(manifest, files):
+    """Mark `files` (from pending / read_new_rows) as ingested into one target."""
+    for f in files:
+        manifest["files"][f["path"].as_posix()] = {
+            "date": f["date"],
+            "size": f["size"],
+            "mtime_ns": f["mtime_ns"],
+            "hash": f["hash"],
+            "symbols": f["symbols"],
+        }
+        keys = set(manifest["keys"].get(f["date"], []))
+        manifest["keys"][f["date"]] = sorted(keys | set(f["symbols"]))
+    return manifest
@@ -0,0 +1,113 @@
+import cProfile
+import json
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+from run_meta import PIPELINE_VERSION, RUN_ID
+
+# ================= CONFIG =================
+# data/reports/run-<RUN_ID>.json (+ profile-<stage>-<RUN_ID>.prof)
+REPORT_PATH = Path("data/reports")
+
+# ================= STATE =================
+# Process-wide: spans aggregate by name (calls / total / max seconds),
+# counters are plain integers. Pool workers ship theirs back with
+# collect() and the parent folds them in with merge().
+_lock = threading.Lock()
+_spans = {}
+_counters = Counter()
+_started = time.time()
+
+
+def _record(name, seconds, calls=1, peak=None):
+    with _lock:
+        s = _spans.setdefault(name, {"calls": 0, "seconds": 0.0, "max_seconds": 0.0})
+        s["calls"] += calls
+        s["seconds"] += seconds
+        s["max_seconds"] = max(s["max_seconds"], seconds if peak is None else peak)
+
+
+@contextmanager
+def span(name):
+    """Times the block under `name` (nested spans are timed independently)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _record(name, time.perf_counter() - start)
+
+
+def count(name, n=1):
+    with _lock:
+        _counters[name] += int(n)
+
+
+def collect(reset=True):
+    """Spans and counters recorded so far (reset by default) — picklable."""
+    global _spans, _counters
+    with _lock:
+        state = {"spans": {k: dict(v) for k, v in _spans.items()}, "counters": dict(_counters)}
+        if reset:
+            _spans, _counters = {}, Counter()
+    return state
+
+
+def merge(state):
+    """Fold a worker's collect() into this process."""
+    if not state:
+        return
+    for name, s in state["spans"].items():
+        _record(name, s["seconds"], s["calls"], s["max_seconds"])
+    with _lock:
+        _counters.update(state["counters"])
+
+
+# ================= PROFILE =================
+@contextmanager
+def profile(name, enabled=True, root=REPORT_PATH):
+    """cProfile the block and dump it to profile-<name>-<RUN_ID>.prof (snakeviz / pstats)."""
+    if not enabled:
+        yield
+        return
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        path = Path(root) / f"profile-{name}-{RUN_ID}.prof"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(path)
+        print(f"[OK] Profile of {name} written to {path}")
+
+
+# ================= REPORT =================
+def report(**extra):
+    state = collect(reset=False)
+    return {
+        "run_id": RUN_ID,
+        "pipeline_version": PIPELINE_VERSION,
+        "started_at_utc": datetime.utcfromtimestamp(_started).strftime("%Y-%m-%d %H:%M:%S"),
+        "wall_seconds": round(time.time() - _started, 3),
+        **extra,
+        "spans": {
+            name: {k: round(v, 4) if isinstance(v, float) else v for k, v in s.items()}
+            for name, s in sorted(state["spans"].items(), key=lambda kv: -kv[1]["seconds"])
+        },
+        "counters": dict(sorted(state["counters"].items())),
+    }
+
+
+def write_report(root=REPORT_PATH, **extra):
+    """JSON run report, tagged with RUN_ID / PIPELINE_VERSION."""
+    data = report(**extra)
+    path = Path(root) / f"run-{data['run_id']}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, indent=2, default=str))
+    print(f"[OK] Run report written to {path}")
+    return path
@@ -0,0 +1,287 @@
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from pathlib import Path
+
+import main as daily
+import snapshot_store
+from exposure_cube import SIDES, strike_profile, strike_split
+from option_chain import OptionChain
+from providers import PROVIDERS, get_provider
+from scenario import ChainScenario, Surface
+
+# ================= CONFIG =================
+# data/store/intraday/date=YYYY-MM-DD/part-*.parquet, one row per (symbol, tick)
+INTRADAY_PATH = Path("data/store/intraday")
+INTRADAY_KEY = ["date", "symbol", "timestamp"]
+
+REFRESH_SECONDS = 300
+CHAIN_EVERY = 1             # re-fetch the chain every N ticks (spot every tick)
+
+# session grid anchored at the first spot: wide enough for the daily
+# +-SCENARIO_RANGE window to follow spot by GRID_RANGE - SCENARIO_RANGE
+GRID_RANGE = 0.15
+GRID_STEP_PCT = 0.001
+
+CONTRACT_KEY = ["type", "dte", "strike"]
+CONTRACT_BLOCK = 2000       # changed contracts priced per grid block
+
+
+# ================= CHAIN STATE =================
+class ChainState:
+    """
+    One symbol's chain for the session plus its aggregates on a fixed
+    price grid:
+
+    net_delta    — (G,)        sum of delta_exp at every grid price
+    gamma        — (K, 2, G)   gamma_exp per strike and side at every grid price
+
+    A chain refresh prices only the contracts whose OI / IV changed (or
+    that appeared / disappeared): their old contribution is subtracted and
+    the new one added. A spot move prices nothing — the levels are read
+    off the grid by interpolation.
+    """
+
+    def __init__(self, symbol, market_date, spot, r=daily.RISK_FREE):
+        self.symbol = symbol
+        self.market_date = market_date
+        self.spot = float(spot)
+        self.r = r
+
+        steps = int(round(GRID_RANGE / GRID_STEP_PCT))
+        self.prices = self.spot * (1 + GRID_STEP_PCT * np.arange(-steps, steps + 1))
+        self.chain = pd.DataFrame(columns=CONTRACT_KEY + ["oi", "iv"]).astype(daily.OPTION_COLUMNS)
+        self.strikes = np.empty(0)
+        self.net_delta = np.zeros(len(self.prices))
+        self.gamma = np.zeros((0, len(SIDES), len(self.prices)))
+        self.scenario = ChainScenario.from_chain(self.chain, r)
+
+    def covers(self, spot):
+        """Whether the daily DNZ window around `spot` fits inside the grid."""
+        return (
+            spot * (1 - daily.SCENARIO_RANGE) >= self.prices[0]
+            and spot * (1 + daily.SCENARIO_RANGE) <= self.prices[-1]
+        )
+
+    # ---------- updates ----------
+    def _strike_rows(self, strikes):
+        new = np.setdiff1d(strikes, self.strikes)
+        if len(new):
+            at = np.searchsorted(self.strikes, new)
+            self.strikes = np.insert(self.strikes, at, new)
+            self.gamma = np.insert(self.gamma, at, 0.0, axis=0)
+        return np.searchsorted(self.strikes, strikes)
+
+    def _add(self, contracts, sign):
+        """Add (+1) or remove (-1) the grid contribution of `contracts`."""
+        contracts = contracts.copy()
+        contracts["oi"] = contracts["oi"] * sign
+
+        for start in range(0, len(contracts), CONTRACT_BLOCK):
+            block = contracts.iloc[start:start + CONTRACT_BLOCK]
+            scenario = ChainScenario.from_chain(block, self.r)
+            if not scenario.ok.any():
+                continue
+
+            delta_exp, gamma_exp = scenario.contract_grid(self.prices)
+            self.net_delta += delta_exp.sum(axis=1)
+
+            priced = block[scenario.ok]
+            rows = self._strike_rows(priced["strike"].to_numpy(dtype=np.float64))
+            side = (priced["type"].to_numpy() != "call").astype(np.int64)
+            np.add.at(self.gamma, (rows, side), gamma_exp.T)
+
+    def apply(self, options_df):
+        """
+        Bring the state to a freshly loaded chain (load_options output).
+        Returns the number of contracts that were (re)priced.
+        """
+        if isinstance(options_df, OptionChain):
+            options_df = options_df.to_frame()
+        new = (
+            options_df[CONTRACT_KEY + ["oi", "iv"]]
+            .astype(daily.OPTION_COLUMNS)
+            .drop_duplicates(CONTRACT_KEY, keep="last")
+        )
+        merged = self.chain.merge(new, on=CONTRACT_KEY, how="outer", suffixes=("_old", ""), indicator=True)
+
+        both = merged["_merge"] == "both"
+        changed = both & ((merged["oi"] != merged["oi_old"]) | (merged["iv"] != merged["iv_old"]))
+        gone = (merged["_merge"] == "left_only") | changed
+        added = (merged["_merge"] == "right_only") | changed
+
+        old = merged.loc[gone, CONTRACT_KEY + ["oi_old", "iv_old"]]
+        self._add(old.rename(columns={"oi_old": "oi", "iv_old": "iv"}), -1)
+        self._add(merged.loc[added, CONTRACT_KEY + ["oi", "iv"]], +1)
+
+        self.chain = new.reset_index(drop=True)
+        # O(contracts) invariants for the two EGP points at any spot
+        self.scenario = ChainScenario.from_chain(self.chain, self.r)
+        return int(gone.sum() + (merged["_merge"] == "right_only").sum())
+
+    def move(self, spot):
+        self.spot = float(spot)
+
+    # ---------- levels ----------
+    def _at_spot(self, values):
+        """Linear interpolation of a (..., G) grid array at spot."""
+        j = int(np.clip(np.searchsorted(self.prices, self.spot) - 1, 0, len(self.prices) - 2))
+        w = (self.spot - self.prices[j]) / (self.prices[j + 1] - self.prices[j])
+        return values[..., j] * (1 - w) + values[..., j + 1] * w
+
+    def surface(self, spot):
+        """
+        The daily DNZ / gamma-flip grid (main.price_grid) around spot, read
+        off the session grid by interpolation — no contract is priced.
+        """
+        prices = daily.price_grid(spot)[:-2]
+        signed = (self.gamma[:, 0] - self.gamma[:, 1]).sum(axis=0)
+        net_gamma = self.gamma.sum(axis=(0, 1))
+        return Surface(
+            prices,
+            np.interp(prices, self.prices, self.net_delta),
+            np.interp(prices, self.prices, net_gamma),
+            np.interp(prices, self.prices, signed),
+        )
+
+    def snapshot(self, timestamp):
+        """
+        One intraday row with the daily definitions (main.build_snapshot):
+        DNZ and gamma flip on the daily grid, EGP as the batched central
+        difference at spot +- eps (two prices x contracts).
+        """
+        spot = self.spot
+        surface = self.surface(spot)
+        egp_points = self.scenario.surface(daily.price_grid(spot)[-2:])
+        per_strike = self._at_spot(self.gamma.sum(axis=1))
+
+        out = daily.snapshot_row(
+            self.symbol, self.market_date, spot,
+            dnz=daily.find_dnz(self.chain, spot, surface),
+            egp=daily.compute_effective_gamma_pressure(self.chain, spot, surface=egp_points),
+            gamma_split=strike_split(self.strikes, per_strike, spot),
+            gamma_profile=strike_profile(self.strikes, per_strike, spot),
+            gamma_flip=daily.compute_gamma_flip(self.chain, spot, surface),
+        )
+        out.insert(1, "timestamp", timestamp)
+        return out
+
+
+# ================= TICK LOOP =================
+def fetch_spot(symbol, provider):
+    hist = provider.history(symbol, period="1d")
+    if hist.empty:
+        return None
+    return float(hist["Close"].iloc[-1])
+
+
+def tick(states, symbols, provider, refresh_chain=True, timestamp=None):
+    """
+    One refresh of every symbol: spot always, chain when refresh_chain.
+    A symbol is rebuilt from scratch on its first tick, on a new market
+    date or when spot has left its grid. Returns the tick's snapshot rows.
+    """
+    timestamp = timestamp or datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
+    market_date = daily.get_last_market_date()
+
+    rows = []
+    for symbol in symbols:
+        try:
+            spot = fetch_spot(symbol, provider)
+            if spot is None:
+                print(f"[SKIP] {symbol} — no spot")
+                continue
+
+            state = states.get(symbol)
+            rebuild = (
+                state is None
+                or state.market_date != market_date
+                or not state.covers(spot)
+            )
+
+            options_df = None
+            if rebuild or refresh_chain:
+                try:
+                    options_df = daily.load_options(symbol, provider=provider)
+                except Exception as e:
+                    if rebuild:
+                        raise
+                    print(f"[WARN] {symbol} — chain refresh failed ({type(e).__name__}: {e}), keeping previous chain")
+
+            if rebuild:
+                if options_df is None or options_df.empty:
+                    print(f"[SKIP] {symbol} — empty chain")
+                    states.pop(symbol, None)
+                    continue
+                state = states[symbol] = ChainState(symbol, market_date, spot)
+
+            if options_df is not None and not options_df.empty:
+                priced = state.apply(options_df)
+            else:
+                # an empty refresh is a bad fetch, not a chain without contracts
+                if options_df is not None:
+                    print(f"[WARN] {symbol} — empty chain refresh, keeping previous chain")
+                priced = 0
+
+            state.move(spot)
+            rows.append(state.snapshot(timestamp))
+            print(f"[TICK] {symbol} {timestamp} spot={spot:.2f} repriced={priced}{' (rebuild)' if rebuild else ''}")
+        except Exception as e:
+            print(f"[FAIL] {symbol} — {type(e).__name__}: {e}")
+
+    return pd.concat(rows, ignore_index=True) if rows else pd.DataFrame()
+
+
+def run_intraday(symbols, provider="yfinance", interval=REFRESH_SECONDS, ticks=0, chain_every=CHAIN_EVERY):
+    """
+    Refresh every `interval` seconds until `ticks` ticks ran (0 = until
+    interrupted); each tick's rows go to the intraday store.
+    """
+    if isinstance(provider, str):
+        provider = get_provider(provider)
+
+    states = {}
+    n = 0
+    try:
+        while not ticks or n < ticks:
+            start = time.monotonic()
+            rows = tick(states, symbols, provider, refresh_chain=n % max(chain_every, 1) == 0)
+            snapshot_store.append(rows, root=INTRADAY_PATH)
+            n += 1
+
+            if ticks and n >= ticks:
+                break
+            time.sleep(max(0.0, interval - (time.monotonic() - start)))
+    except KeyboardInterrupt:
+        print(f"[OK] stopped after {n} ticks")
+    return states
+
+
+def read_intraday(symbols=None, start=None, end=None, columns=None):
+    return snapshot_store.read(symbols, start, end, columns, root=INTRADAY_PATH, key=INTRADAY_KEY)
+
+
+# ================= ENTRY =================
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Intraday incremental gamma snapshots")
+    parser.add_argument("--symbols", nargs="*", help="symbols to run (default: SYMBOLS)")
+    parser.add_argument("--symbols-file", help="file with the symbol universe")
+    parser.add_argument("--provider", default="yfinance", choices=sorted(PROVIDERS))
+    parser.add_argument("--interval", type=float, default=REFRESH_SECONDS, help="seconds between ticks")
+    parser.add_argument("--ticks", type=int, default=0, help="stop after N ticks (0 = run until interrupted)")
+    parser.add_argument("--chain-every", type=int, default=CHAIN_EVERY,
+                        help="re-fetch option chains every N ticks (spot is refreshed every tick)")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    run_intraday(
+        daily.load_symbols(args.symbols, args.symbols_file),
+        provider=args.provider,
+        interval=args.interval,
+        ticks=args.ticks,
+        chain_every=args.chain_every,
+    )
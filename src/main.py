@@ -1,30 +1,37 @@
-import yfinance as yf
+import argparse
+import sys
+import time
 import pandas as pd
 import numpy as np
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from pathlib import Path
 from math import sqrt
-from py_vollib.black_scholes.greeks.analytical import delta, gamma
-import pandas_market_calendars as mcal
+from py_vollib.black_scholes.greeks.analytical import delta
+
+from scenario import ChainScenario, zero_crossing
+from exposure_cube import GammaCube, save_cube, save_cubes
+from option_chain import OptionChain
+from chain_cache import save_chain, load_chain, cached_dates
+from providers import PROVIDERS, get_provider
+import instrument
+import netio
+import snapshot_store
+from trading_calendar import get_calendar
 
 # ================= NYSE CALENDAR =================
-nyse = mcal.get_calendar("NYSE")
-
 def get_last_market_date():
     """
     Zwraca ostatni dzień handlowy NYSE.
-    Uwzględnia weekendy, święta i half-days.
+    Uwzględnia weekendy, święta i half-days (indeks sesji z trading_calendar).
     """
     today = datetime.utcnow().date()
-    schedule = nyse.schedule(
-        start_date=today - pd.Timedelta(days=7),
-        end_date=today
-    )
+    last_session = get_calendar().last_session(today)
 
-    if schedule.empty:
+    if last_session is None:
         return today.strftime("%Y-%m-%d")
 
-    last_session = schedule.index[-1]
-    return last_session.strftime("%Y-%m-%d")
+    return last_session
 
 
 # ================= BUCKETS =================
@@ -62,102 +69,177 @@ def dte_weight(dte):
 
 
 # ================= OPTIONS LOAD =================
-def load_options(symbol):
-    ticker = yf.Ticker(symbol)
-    rows = []
-
-    for exp in ticker.options:
-        exp_date = datetime.strptime(exp, "%Y-%m-%d")
-        dte = (exp_date - datetime.utcnow()).days
-
-        if dte <= 0 or dte > 30:
-            continue
-
-        chain = ticker.option_chain(exp)
-        for side, df in [("call", chain.calls), ("put", chain.puts)]:
-            for _, r in df.iterrows():
-                if r["openInterest"] > 0 and r["impliedVolatility"] > 0:
-                    rows.append({
-                        "strike": r["strike"],
-                        "oi": r["openInterest"],
-                        "iv": r["impliedVolatility"],
-                        "dte": dte,
-                        "type": side,
-                    })
+MAX_DTE = 30
+LOADER_WORKERS = 8
+
+OPTION_COLUMNS = {
+    "strike": "float64",
+    "oi": "float64",
+    "iv": "float64",
+    "dte": "int64",
+    "type": "object",
+}
+
+
+def _project_side(df, side, dte):
+    if df is None or df.empty:
+        return None
+
+    oi = pd.to_numeric(df["openInterest"], errors="coerce")
+    iv = pd.to_numeric(df["impliedVolatility"], errors="coerce")
+    mask = ((oi > 0) & (iv > 0)).to_numpy()
+    if not mask.any():
+        return None
+
+    return OptionChain(
+        strike=df["strike"].to_numpy()[mask],
+        iv=iv.to_numpy()[mask],
+        dte=np.full(mask.sum(), dte),
+        is_call=np.full(mask.sum(), side == "call"),
+        oi=oi.to_numpy()[mask],
+    )
 
-    return pd.DataFrame(rows)
 
+def load_options(symbol, provider=None, max_workers=LOADER_WORKERS, now=None):
+    """
+    Calls and puts with OI > 0 and IV > 0 for every expiry inside the
+    MAX_DTE window, as one OptionChain. Expiries are fetched concurrently
+    on a bounded thread pool from any MarketDataProvider (yfinance by
+    default).
+    """
+    provider = provider if provider is not None else get_provider()
+    now = now if now is not None else datetime.utcnow()
 
-# ================= GREEKS =================
-def compute_greeks(df, spot):
-    deltas, gammas = [], []
-
-    for _, r in df.iterrows():
-        flag = "c" if r["type"] == "call" else "p"
-        try:
-            d = delta(flag, spot, r["strike"], r["dte"] / 365, RISK_FREE, r["iv"])
-            g = gamma(flag, spot, r["strike"], r["dte"] / 365, RISK_FREE, r["iv"])
-        except Exception:
-            d, g = 0.0, 0.0
-
-        w = dte_weight(r["dte"])
-        deltas.append(d * r["oi"] * w)
-        gammas.append(g * r["oi"] * w)
-
-    df["delta_exp"] = deltas
-    df["gamma_exp"] = gammas
-    return df
+    expiries = []
+    for exp in provider.expiries(symbol):
+        dte = (datetime.strptime(exp, "%Y-%m-%d") - now).days
+        if 0 < dte <= MAX_DTE:
+            expiries.append((exp, dte))
 
+    if not expiries:
+        return OptionChain.blank()
 
-# ================= GAMMA PROFILE =================
-def compute_gamma_profile(df, spot):
-    gamma_by_strike = df.groupby("strike")["gamma_exp"].sum().sort_index()
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(expiries)))) as pool:
+        chains = list(pool.map(lambda e: provider.option_chain(symbol, e[0]), expiries))
 
-    if gamma_by_strike.empty:
-        return {
-            "gamma_peak_price": np.nan,
-            "gamma_concentration": 0.0,
-            "gamma_distance_from_spot": 0.0,
-        }
+    parts = []
+    for (_, dte), (calls, puts) in zip(expiries, chains):
+        for side, df in [("call", calls), ("put", puts)]:
+            parts.append(_project_side(df, side, dte))
 
-    gamma_peak_price = gamma_by_strike.abs().idxmax()
-    total_gamma = gamma_by_strike.abs().sum()
-    top_gamma = gamma_by_strike.abs().nlargest(3).sum()
+    return OptionChain.concat(parts)
 
-    return {
-        "gamma_peak_price": gamma_peak_price,
-        "gamma_concentration": top_gamma / total_gamma if total_gamma else 0.0,
-        "gamma_distance_from_spot": (gamma_peak_price - spot) / spot,
-    }
 
+# ================= SCENARIO SURFACE =================
+SCENARIO_RANGE = 0.10      # DNZ / gamma-flip grid: spot +- 10%
+SCENARIO_POINTS = 200
+EGP_EPS_PCT = 0.002
 
-# ================= DNZ =================
-def find_dnz(df, spot):
-    prices = np.linspace(spot * 0.9, spot * 1.1, 200)
-    net_deltas = []
 
-    for p in prices:
-        total = 0.0
-        for _, r in df.iterrows():
-            flag = "c" if r["type"] == "call" else "p"
-            try:
-                d = delta(flag, p, r["strike"], r["dte"] / 365, RISK_FREE, r["iv"])
-            except Exception:
-                d = 0.0
+def price_grid(spot, eps_pct=EGP_EPS_PCT):
+    """The DNZ / gamma-flip grid followed by the two EGP points spot +- eps."""
+    grid = np.linspace(spot * (1 - SCENARIO_RANGE), spot * (1 + SCENARIO_RANGE), SCENARIO_POINTS)
+    eps = spot * eps_pct
+    return np.concatenate([grid, [spot - eps, spot + eps]])
 
-            total += d * r["oi"] * dte_weight(r["dte"])
-        net_deltas.append(total)
 
-    idx = np.argmin(np.abs(net_deltas))
+def scenario_surface(df, spot, scenario=None, eps_pct=EGP_EPS_PCT):
+    """
+    (grid surface, EGP surface) from a single price x contract evaluation
+    of the chain; DNZ, EGP and the gamma flip are all read from it.
+    """
+    scenario = scenario or ChainScenario.from_chain(df, RISK_FREE)
+    surface = scenario.surface(price_grid(spot, eps_pct))
+    return surface[:-2], surface[-2:]
+
+
+# ================= GREEKS =================
+def compute_greeks(df, spot, scenario=None):
+    """
+    delta_exp / gamma_exp for the whole chain in one NumPy pass
+    (ChainScenario.exposures — matches py_vollib within
+    scenario.GREEKS_TOLERANCE). An OptionChain keeps them as arrays, a frame
+    gets two columns.
+    """
+    scenario = scenario or ChainScenario.from_chain(df, RISK_FREE)
+    if isinstance(df, OptionChain):
+        df.delta_exp, df.gamma_exp = scenario.exposures(spot)
+    else:
+        df["delta_exp"], df["gamma_exp"] = scenario.exposures(spot)
+    return df
+
+
+# ================= GAMMA PROFILE =================
+def compute_gamma_profile(df, spot, cube=None):
+    """Peak / concentration / distance, read from the strike x expiry gamma cube."""
+    if cube is None:
+        cube = GammaCube.from_chain(df)
+    return cube.profile(spot)
+
+
+# ================= DNZ =================
+def find_dnz(df, spot, surface=None):
+    if surface is None:
+        surface, _ = scenario_surface(df, spot)
+
+    prices = surface.prices
+    idx = np.argmin(np.abs(surface.net_delta))
     dnz_mid = prices[idx]
     width = (prices.max() - prices.min()) * 0.005
     return dnz_mid - width, dnz_mid, dnz_mid + width
 
 
+# ================= GAMMA FLIP =================
+def compute_gamma_flip(df, spot, surface=None):
+    """
+    Price where signed gamma (calls +, puts -) crosses zero, closest to
+    spot on the scenario grid; NaN when it does not flip inside the grid.
+    """
+    if surface is None:
+        surface, _ = scenario_surface(df, spot)
+    return zero_crossing(surface.prices, surface.signed_gamma, spot)
+
+
 # ================= EGP =================
-def compute_effective_gamma_pressure(df, spot, eps_pct=0.002):
+EGP_METHODS = ("analytic", "batched", "finite_difference")
+
+
+def compute_effective_gamma_pressure(df, spot, eps_pct=EGP_EPS_PCT, method="batched", surface=None):
+    """
+    |d(net delta) / d(spot)| of the dte-weighted chain.
+
+    analytic           — sum of gamma_exp at spot (no extra chain scan)
+    batched            — central difference of the scenario net delta at
+                         spot +- eps (default: same value as the logged
+                         history); `surface` = those two points
+    finite_difference  — reference: per-contract py_vollib central difference
+
+    The central-difference modes differ from the analytic one by O(eps^2)
+    (~0.05% at the default eps_pct).
+    """
+    if method not in EGP_METHODS:
+        raise ValueError(f"Unknown EGP method: {method}")
+
+    if method == "analytic":
+        if isinstance(df, OptionChain):
+            if df.gamma_exp is None:
+                df = compute_greeks(df.take(slice(None)), spot)
+            return abs(df.gamma_exp.sum())
+        if "gamma_exp" not in df.columns:
+            df = compute_greeks(df.copy(), spot)
+        return abs(df["gamma_exp"].sum())
+
     eps = spot * eps_pct
 
+    if method == "batched":
+        if surface is None:
+            surface = ChainScenario.from_chain(df, RISK_FREE).surface([spot - eps, spot + eps])
+        down, up = surface.net_delta
+        return abs(up - down) / (2 * eps)
+
+    if isinstance(df, OptionChain):
+        df = df.to_frame()
+
     def net_delta(p):
         total = 0.0
         for _, r in df.iterrows():
@@ -172,41 +254,39 @@ def compute_effective_gamma_pressure(df, spot, eps_pct=0.002):
     return abs(net_delta(spot + eps) - net_delta(spot - eps)) / (2 * eps)
 
 
-# ================= MAIN RUN =================
-def run(symbol):
-    ticker = yf.Ticker(symbol)
-
-    hist = ticker.history(period="5d")
-    if hist.empty:
-        return
-
-    spot = hist["Close"].iloc[-1]
-    market_date = get_last_market_date()
-
-    # --- SAFE GUARD: future date ---
-    today = datetime.utcnow().date()
-    if pd.to_datetime(market_date).date() > today:
-        print(f"[SKIP] {symbol} — future market date {market_date}")
-        return
-
-    options_df = load_options(symbol)
-    if options_df.empty:
-        return
+# ================= SNAPSHOT =================
+def build_snapshot(symbol, market_date, spot, options_df, cube=None, scenario=None):
+    """
+    One snapshot row. Gamma aggregates come from the gamma cube; DNZ,
+    EGP and the gamma flip from one scenario surface. A caller passing
+    `cube` has already run compute_greeks on options_df.
+    """
+    scenario = scenario or ChainScenario.from_chain(options_df, RISK_FREE)
+    if cube is None:
+        options_df = compute_greeks(options_df, spot, scenario)
+        cube = GammaCube.from_chain(options_df)
+
+    grid, egp_points = scenario_surface(options_df, spot, scenario)
+    return snapshot_row(
+        symbol, market_date, spot,
+        dnz=find_dnz(options_df, spot, grid),
+        egp=compute_effective_gamma_pressure(options_df, spot, surface=egp_points),
+        gamma_split=cube.split(spot),
+        gamma_profile=cube.profile(spot),
+        gamma_flip=compute_gamma_flip(options_df, spot, grid),
+    )
 
-    options_df = compute_greeks(options_df, spot)
-    gamma_profile = compute_gamma_profile(options_df, spot)
 
-    gamma_above = options_df[options_df["strike"] > spot]["gamma_exp"].sum()
-    gamma_below = options_df[options_df["strike"] < spot]["gamma_exp"].sum()
+def snapshot_row(symbol, market_date, spot, dnz, egp, gamma_split, gamma_profile, gamma_flip):
+    """One-row snapshot frame from the computed levels (shared with intraday ticks)."""
+    dnz_low, dnz_mid, dnz_high = dnz
+    gamma_above, gamma_below = gamma_split
 
     gamma_total = gamma_above + gamma_below
     gamma_ratio = gamma_above / gamma_total if gamma_total else 0.0
     gamma_diff = gamma_above - gamma_below
     gamma_asym_strength = abs(gamma_diff) / gamma_total if gamma_total else 0.0
 
-    dnz_low, dnz_mid, dnz_high = find_dnz(options_df, spot)
-    egp = compute_effective_gamma_pressure(options_df, spot)
-
     out = pd.DataFrame([{
         "date": market_date,
         "week": week_from_date(market_date),
@@ -231,19 +311,273 @@ def run(symbol):
         "gamma_peak_price": gamma_profile["gamma_peak_price"],
         "gamma_concentration": gamma_profile["gamma_concentration"],
         "gamma_distance_from_spot": gamma_profile["gamma_distance_from_spot"],
+        "gamma_flip": gamma_flip,
         "close_t+1": "",
         "close_t+2": "",
         "close_t+5": "",
         "event_flag": "",
     }])
 
-    out.to_csv(
-        f"data/snapshots/{market_date}_{symbol}.csv",
-        index=False,
-        float_format="%.10f",
+    return out
+
+
+# ================= MAIN RUN =================
+def fetch_inputs(symbol, provider):
+    """(market_date, spot, options_df) from a market data provider, or None."""
+    with instrument.span("fetch.history"):
+        hist = provider.history(symbol, period="5d")
+    if hist.empty:
+        return None
+
+    spot = hist["Close"].iloc[-1]
+    market_date = get_last_market_date()
+
+    # --- SAFE GUARD: future date ---
+    today = datetime.utcnow().date()
+    if pd.to_datetime(market_date).date() > today:
+        print(f"[SKIP] {symbol} — future market date {market_date}")
+        return None
+
+    with instrument.span("fetch.options"):
+        options_df = load_options(symbol, provider=provider)
+    instrument.count("contracts.loaded", len(options_df))
+    if options_df.empty:
+        return None
+
+    with instrument.span("chain_cache.save"):
+        save_chain(symbol, market_date, options_df, spot)
+    return market_date, spot, options_df
+
+
+def replay_inputs(symbol, market_date=None):
+    """(market_date, spot, options_df) from the chain cache — no network."""
+    if market_date is None:
+        dates = cached_dates(symbol)
+        if not dates:
+            print(f"[SKIP] {symbol} — no cached chains")
+            return None
+        market_date = dates[-1]
+
+    with instrument.span("chain_cache.load"):
+        cached = load_chain(symbol, market_date)
+    if cached is None:
+        print(f"[SKIP] {symbol} — no cached chain for {market_date}")
+        return None
+
+    options_df, spot = cached
+    return market_date, spot, options_df
+
+
+def run(symbol, replay=False, market_date=None, provider="yfinance", write=True, cubes=None):
+    """
+    Snapshot row for one symbol (or None). With write=True the row and
+    its gamma cube are stored right away; the universe runner passes
+    False plus a `cubes` dict ((date, symbol) -> (cube, spot)) and writes
+    every symbol's row and cube in one batch per date instead.
+    """
+    if replay:
+        inputs = replay_inputs(symbol, market_date)
+    else:
+        if isinstance(provider, str):
+            provider = get_provider(provider)
+        inputs = fetch_inputs(symbol, provider)
+    if inputs is None:
+        return
+
+    market_date, spot, options_df = inputs
+    with instrument.span("compute.greeks"):
+        scenario = ChainScenario.from_chain(options_df, RISK_FREE)
+        options_df = compute_greeks(options_df, spot, scenario)
+    with instrument.span("compute.gamma_cube"):
+        cube = GammaCube.from_chain(options_df)
+    with instrument.span("compute.snapshot"):
+        out = build_snapshot(symbol, market_date, spot, options_df, cube, scenario)
+
+    instrument.count("contracts.priced", len(options_df))
+    instrument.count("contracts.scenario_prices", len(options_df) * len(price_grid(spot)))
+    instrument.count("snapshots.built")
+
+    if cubes is not None:
+        cubes[(market_date, symbol)] = (cube, spot)
+    if write:
+        with instrument.span("snapshot_store.append"):
+            snapshot_store.append(out)
+        with instrument.span("cube_store.save"):
+            save_cube(cube, market_date, symbol, spot)
+    return out
+
+
+# ================= UNIVERSE RUNNER =================
+DEFAULT_WORKERS = 4
+
+
+def load_symbols(symbols=None, symbols_file=None):
+    """
+    Symbol universe from CLI arguments and/or a file (one or more symbols
+    per line, comma/space separated, '#' comments). Falls back to SYMBOLS.
+    """
+    universe = []
+    for s in symbols or []:
+        universe += [x for x in s.replace(",", " ").split()]
+
+    if symbols_file:
+        for line in Path(symbols_file).read_text().splitlines():
+            line = line.split("#", 1)[0]
+            universe += line.replace(",", " ").split()
+
+    universe = universe or SYMBOLS
+    # upper-case, de-duplicate, keep order
+    return list(dict.fromkeys(s.strip().upper() for s in universe if s.strip()))
+
+
+def _run_timed(symbol, ship_metrics=False, **run_kwargs):
+    """
+    run() with status and timing. In a pool worker (ship_metrics) the
+    worker's spans / counters travel back with the result.
+    """
+    if ship_metrics:
+        instrument.collect()     # drop whatever a forked worker inherited
+
+    start = time.perf_counter()
+    cubes = {}
+    try:
+        snapshot = run(symbol, write=False, cubes=cubes, **run_kwargs)
+        if snapshot is not None:
+            status, detail = "ok", str(snapshot["date"].iloc[0])
+        else:
+            status, detail = "skipped", "no data"
+    except Exception as e:
+        snapshot = None
+        status, detail = "failed", f"{type(e).__name__}: {e}"
+    instrument.count(f"symbols.{status}")
+    return {
+        "symbol": symbol,
+        "status": status,
+        "seconds": round(time.perf_counter() - start, 2),
+        "detail": detail,
+        "snapshot": snapshot,
+        "cubes": cubes,
+        "metrics": instrument.collect() if ship_metrics else None,
+    }
+
+
+def _network_hosts(replay=False, provider="yfinance", **_):
+    """netio hosts a run() with these arguments fetches from."""
+    if replay:
+        return []
+    provider = PROVIDERS.get(provider) if isinstance(provider, str) else provider
+    host = getattr(provider, "host", None)
+    return [host] if host else []
+
+
+def save_cube_batch(cubes):
+    """{(date, symbol): (cube, spot)} -> one cube store write per date."""
+    by_date = {}
+    for (d, symbol), entry in cubes.items():
+        by_date.setdefault(d, {})[symbol] = entry
+    for d, entries in sorted(by_date.items()):
+        save_cubes(entries, d)
+
+
+def run_universe(symbols, workers=DEFAULT_WORKERS, **run_kwargs):
+    """
+    run() for every symbol on a process pool. A failing symbol is
+    recorded in the result table and does not stop the others. All
+    snapshot rows are appended to the store, and all gamma cubes to
+    their date's cube file, in one batch at the end. Each worker gets 1/workers of the netio host limits, so the pool as
+    a whole stays inside them; the pool is capped so that it can.
+    Returns (report, snapshots).
+    """
+    hosts = _network_hosts(**run_kwargs)
+    workers = netio.pool_size(min(workers, len(symbols)), hosts) if symbols else 0
+    if workers <= 1:
+        results = [_run_timed(s, **run_kwargs) for s in symbols]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=netio.share_limits,
+                                 initargs=(workers, hosts)) as pool:
+            futures = {pool.submit(_run_timed, s, ship_metrics=True, **run_kwargs): s for s in symbols}
+            results = []
+            for fut in as_completed(futures):
+                try:
+                    results.append(fut.result())
+                except Exception as e:
+                    # worker process died (not an exception inside run)
+                    results.append({
+                        "symbol": futures[fut],
+                        "status": "failed",
+                        "seconds": float("nan"),
+                        "detail": f"{type(e).__name__}: {e}",
+                        "snapshot": None,
+                        "cubes": {},
+                        "metrics": None,
+                    })
+                    instrument.count("symbols.failed")
+
+    for r in results:
+        instrument.merge(r.pop("metrics"))
+
+    snapshots = [s for s in (r.pop("snapshot") for r in results) if s is not None]
+    snapshots = pd.concat(snapshots, ignore_index=True) if snapshots else pd.DataFrame()
+    with instrument.span("snapshot_store.append"):
+        snapshot_store.append(snapshots)
+    instrument.count("snapshots.written", len(snapshots))
+
+    cubes = {}
+    for r in results:
+        cubes.update(r.pop("cubes"))
+    with instrument.span("cube_store.save"):
+        save_cube_batch(cubes)
+
+    order = {s: i for i, s in enumerate(symbols)}
+    report = pd.DataFrame(results).sort_values(
+        "symbol", key=lambda c: c.map(order)
+    ).reset_index(drop=True)
+    return report, snapshots
+
+
+def print_run_report(report):
+    print(report.to_string(index=False))
+    counts = report["status"].value_counts()
+    print(
+        f"[OK] {counts.get('ok', 0)} ok | "
+        f"{counts.get('skipped', 0)} skipped | "
+        f"{counts.get('failed', 0)} failed | "
+        f"{report['seconds'].sum():.1f}s total"
     )
 
 
+def add_run_arguments(parser):
+    parser.add_argument("--symbols", nargs="*", help="symbols to run (default: SYMBOLS)")
+    parser.add_argument("--symbols-file", help="file with the symbol universe")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help="process pool size (1 = run inline)")
+    parser.add_argument("--replay", action="store_true",
+                        help="recompute snapshots from the chain cache (no network)")
+    parser.add_argument("--date", help="market date to replay (default: latest cached)")
+    parser.add_argument("--provider", default="yfinance", choices=sorted(PROVIDERS),
+                        help="market data provider for live runs")
+    return parser
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Options gamma daily snapshots")
+    return add_run_arguments(parser).parse_args(argv)
+
+
 if __name__ == "__main__":
-    for s in SYMBOLS:
-        run(s)
\ No newline at end of file
+    args = parse_args()
+    symbols = load_symbols(args.symbols, args.symbols_file)
+
+    report, _ = run_universe(
+        symbols,
+        workers=args.workers,
+        replay=args.replay,
+        market_date=args.date,
+        provider=args.provider,
+    )
+    print_run_report(report)
+    instrument.write_report(entry="main")
+
+    # only a run where nothing succeeded fails the job
+    if len(report) and (report["status"] == "failed").all():
+        sys.exit(1)
@@ -0,0 +1,292 @@
+import asyncio
+import inspect
+import os
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from email.utils import parsedate_to_datetime
+
+import instrument
+
+# ================= POLICIES =================
+class HostPolicy:
+    """
+    Limits for one logical host:
+    concurrency   — calls in flight at once
+    rate / burst  — token bucket: sustained calls per second, bucket size
+    max_attempts  — tries per call (retryable errors only)
+    backoff_*     — exponential backoff with full jitter, seconds
+    """
+
+    def __init__(self, concurrency=4, rate=5.0, burst=5, max_attempts=5,
+                 backoff_base=0.5, backoff_cap=30.0):
+        self.concurrency = concurrency
+        self.rate = rate
+        self.burst = burst
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+
+    def share(self, n):
+        """This policy's 1/n slice, for one of n processes hitting the same host."""
+        return HostPolicy(
+            concurrency=max(1, self.concurrency // n),
+            rate=self.rate / n,
+            burst=max(1, self.burst // n),
+            max_attempts=self.max_attempts,
+            backoff_base=self.backoff_base,
+            backoff_cap=self.backoff_cap,
+        )
+
+
+# Limits are enforced per process (one fetcher per process, see below).
+# Process pools that fetch in every worker must size the pool with
+# pool_size() and call share_limits(n) in each worker, so the n processes
+# together stay inside these numbers.
+HOST_POLICIES = {
+    # Yahoo throttles bursts of option_chain calls with 429s
+    "yahoo": HostPolicy(concurrency=4, rate=2.0, burst=4),
+    # Sheets API quota: 60 requests / minute / user
+    "sheets": HostPolicy(concurrency=2, rate=1.0, burst=5, backoff_base=2.0, backoff_cap=64.0),
+}
+DEFAULT_POLICY = HostPolicy()
+
+RETRY_STATUS = {408, 429, 500, 502, 503, 504}
+
+
+# ================= ERRORS =================
+def _status(exc):
+    for value in (
+        getattr(exc, "status", None),
+        getattr(exc, "code", None),                                 # urllib HTTPError
+        getattr(getattr(exc, "response", None), "status_code", None),  # requests / gspread APIError
+    ):
+        if isinstance(value, int):
+            return value
+    return None
+
+
+def is_retryable(exc):
+    """Throttling, server errors and dropped connections are retried; anything else is raised."""
+    status = _status(exc)
+    if status is not None:
+        return status in RETRY_STATUS
+    if "RateLimit" in type(exc).__name__:     # yfinance YFRateLimitError
+        return True
+    return isinstance(exc, (ConnectionError, TimeoutError, urllib.error.URLError))
+
+
+def is_throttled(exc):
+    return _status(exc) == 429 or "RateLimit" in type(exc).__name__
+
+
+def retry_after(exc):
+    """Seconds from a Retry-After header (delta or HTTP date), or None."""
+    headers = getattr(exc, "headers", None)
+    if headers is None:
+        headers = getattr(getattr(exc, "response", None), "headers", None)
+    value = headers.get("Retry-After") if headers is not None else None
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt, policy, rng=random):
+    """Full jitter: uniform(0, min(cap, base * 2^attempt))."""
+    return rng.uniform(0, min(policy.backoff_cap, policy.backoff_base * 2 ** attempt))
+
+
+# ================= TOKEN BUCKET =================
+class TokenBucket:
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.not_before = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self.not_before:
+                    await asyncio.sleep(self.not_before - now)
+                elif self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                else:
+                    await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def pause(self, seconds):
+        """Hold every caller of this host (server said: slow down)."""
+        self.not_before = max(self.not_before, time.monotonic() + seconds)
+
+
+# ================= FETCHER =================
+class AsyncFetcher:
+    """
+    Runs calls per logical host under a concurrency limit, a token bucket
+    and retries with backoff. Blocking functions (yfinance, gspread) run
+    in worker threads; coroutine functions are awaited directly.
+    """
+
+    def __init__(self, policies=None, rng=None):
+        self.policies = {**HOST_POLICIES, **(policies or {})}
+        self.rng = rng or random.Random()
+        self._limits = {}
+        self.stats = {}
+
+    def policy(self, host):
+        return self.policies.get(host, DEFAULT_POLICY)
+
+    def _host(self, host):
+        if host not in self._limits:
+            p = self.policy(host)
+            self._limits[host] = (asyncio.Semaphore(p.concurrency), TokenBucket(p.rate, p.burst))
+            self.stats[host] = {"calls": 0, "attempts": 0, "retries": 0, "throttled": 0, "failed": 0}
+        return self._limits[host]
+
+    async def call(self, host, fn, *args, **kwargs):
+        policy = self.policy(host)
+        semaphore, bucket = self._host(host)
+        stats = self.stats[host]
+        stats["calls"] += 1
+        instrument.count(f"api.{host}.calls")
+
+        for attempt in range(policy.max_attempts):
+            async with semaphore:
+                with instrument.span(f"api.{host}.rate_wait"):
+                    await bucket.acquire()
+                stats["attempts"] += 1
+                try:
+                    with instrument.span(f"api.{host}"):
+                        if inspect.iscoroutinefunction(fn):
+                            return await fn(*args, **kwargs)
+                        return await asyncio.to_thread(fn, *args, **kwargs)
+                except Exception as e:
+                    if not is_retryable(e) or attempt == policy.max_attempts - 1:
+                        stats["failed"] += 1
+                        instrument.count(f"api.{host}.failed")
+                        raise
+                    wait = retry_after(e)
+                    if wait is None:
+                        wait = backoff_delay(attempt, policy, self.rng)
+                    if is_throttled(e):
+                        stats["throttled"] += 1
+                        instrument.count(f"api.{host}.throttled")
+                        bucket.pause(wait)
+
+            stats["retries"] += 1
+            instrument.count(f"api.{host}.retries")
+            await asyncio.sleep(wait)
+
+    async def gather(self, host, calls, return_exceptions=False):
+        """[(fn, args...), ...] -> results in order, run under the host limits."""
+        return await asyncio.gather(
+            *(self.call(host, fn, *args) for fn, *args in calls),
+            return_exceptions=return_exceptions,
+        )
+
+
+# ================= SYNC WRAPPER =================
+# One event loop thread per process owns the fetcher, so the host limits
+# are shared by every thread (e.g. the load_options pool) of the process.
+_loop = None
+_loop_pid = None
+_fetcher = None
+_loop_lock = threading.Lock()
+
+
+def _background_loop():
+    global _loop, _loop_pid, _fetcher
+    with _loop_lock:
+        # a forked worker inherits the globals but not the loop thread
+        if _loop is None or _loop_pid != os.getpid():
+            _loop = asyncio.new_event_loop()
+            _loop_pid = os.getpid()
+            _fetcher = AsyncFetcher()
+            threading.Thread(target=_loop.run_forever, name="netio", daemon=True).start()
+    return _loop
+
+
+def get_fetcher():
+    _background_loop()
+    return _fetcher
+
+
+def pool_size(workers, hosts):
+    """
+    Largest pool <= workers whose share_limits() slices of `hosts` add up
+    to at most each host's limits: every worker needs one concurrency
+    slot and one burst token, so n <= min(concurrency, burst).
+    """
+    limits = [min(p.concurrency, p.burst) for p in (HOST_POLICIES.get(h, DEFAULT_POLICY) for h in hosts)]
+    return max(1, min([workers, *limits]))
+
+
+def share_limits(n, hosts=None):
+    """
+    Process pool initializer: give this process 1/n of the policy of every
+    host in `hosts` (default: all). Must run before the first call (the
+    fetcher copies the policies).
+    """
+    global DEFAULT_POLICY
+    if n <= 1:
+        return
+    for host in HOST_POLICIES if hosts is None else hosts:
+        HOST_POLICIES[host] = HOST_POLICIES.get(host, DEFAULT_POLICY).share(n)
+    if hosts is None:
+        DEFAULT_POLICY = DEFAULT_POLICY.share(n)
+
+
+def run(coro):
+    """Run a coroutine on the background loop and wait for its result."""
+    loop = _background_loop()
+    if threading.current_thread().name == "netio":
+        raise RuntimeError("netio.run() called from inside the netio loop; await instead")
+    return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+
+def call(host, fn, *args, **kwargs):
+    """Blocking call of fn(*args, **kwargs) under the limits of `host`."""
+    return run(get_fetcher().call(host, fn, *args, **kwargs))
+
+
+class Guarded:
+    """Proxy whose method calls go through call(host, ...); attributes pass through."""
+
+    def __init__(self, target, host):
+        self._target = target
+        self._host = host
+
+    def __getattr__(self, name):
+        attr = getattr(self._target, name)
+        if not callable(attr):
+            return attr
+
+        def guarded(*args, **kwargs):
+            return call(self._host, attr, *args, **kwargs)
+        return guarded
+
+
+# ================= HTTP =================
+def http_get(url, timeout=30):
+    """GET -> body bytes; HTTP errors raise urllib.error.HTTPError (status in .code)."""
+    with urllib.request.urlopen(url, timeout=timeout) as resp:
+        return resp.read()
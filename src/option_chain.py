@@ -0,0 +1,114 @@
+import numpy as np
+import pandas as pd
+
+# ================= CONFIG =================
+# strike / iv precision. float64 by default so greeks match py_vollib
+# within scenario.GREEKS_TOLERANCE; COMPACT_FLOAT (float32) is opt-in for
+# memory-bound uses and shifts greeks by ~1e-5.
+CHAIN_FLOAT = np.float64
+COMPACT_FLOAT = np.float32
+
+SIDE_CATEGORIES = ["call", "put"]
+
+
+# ================= CONTAINER =================
+class OptionChain:
+    """
+    Struct-of-arrays option chain: one contiguous typed array per field.
+
+    strike   float64 (CHAIN_FLOAT; float32 with float_dtype=COMPACT_FLOAT)
+    iv       float64 (CHAIN_FLOAT; float32 with float_dtype=COMPACT_FLOAT)
+    dte      int16
+    is_call  bool
+    oi       int32
+
+    ~23 bytes per contract (~15 compact) against ~40 bytes + a Python
+    string per row in the old frame. compute_greeks stores delta_exp / gamma_exp
+    (float64) on the chain instead of adding frame columns. Converting
+    to and from a DataFrame shares the field arrays (no copies) when
+    the dtypes already match.
+    """
+
+    FIELDS = ("strike", "iv", "dte", "is_call", "oi")
+
+    def __init__(self, strike, iv, dte, is_call, oi, float_dtype=CHAIN_FLOAT):
+        self.strike = np.asarray(strike, dtype=float_dtype)
+        self.iv = np.asarray(iv, dtype=float_dtype)
+        self.dte = np.asarray(dte, dtype=np.int16)
+        self.is_call = np.asarray(is_call, dtype=bool)
+        self.oi = np.asarray(np.rint(oi) if np.asarray(oi).dtype.kind == "f" else oi, dtype=np.int32)
+        self.delta_exp = None
+        self.gamma_exp = None
+
+    # ---------- construction ----------
+    @classmethod
+    def blank(cls):
+        return cls([], [], [], [], [])
+
+    @classmethod
+    def from_frame(cls, df, float_dtype=CHAIN_FLOAT):
+        """From a frame with strike / iv / dte / oi / type ("call" | "put")."""
+        if isinstance(df, OptionChain):
+            return df
+        chain = cls(
+            df["strike"].to_numpy(),
+            df["iv"].to_numpy(),
+            df["dte"].to_numpy(),
+            (df["type"] == "call").to_numpy(),
+            df["oi"].to_numpy(),
+            float_dtype,
+        )
+        for col in ("delta_exp", "gamma_exp"):
+            if col in df.columns:
+                setattr(chain, col, df[col].to_numpy(dtype=np.float64))
+        return chain
+
+    @classmethod
+    def concat(cls, chains):
+        chains = [c for c in chains if c is not None and len(c)]
+        if not chains:
+            return cls.blank()
+        return cls(*(np.concatenate([getattr(c, f) for c in chains]) for f in cls.FIELDS),
+                   float_dtype=chains[0].strike.dtype)
+
+    # ---------- views ----------
+    def __len__(self):
+        return len(self.strike)
+
+    @property
+    def empty(self):
+        return len(self) == 0
+
+    @property
+    def nbytes(self):
+        arrays = [getattr(self, f) for f in self.FIELDS] + [self.delta_exp, self.gamma_exp]
+        return sum(a.nbytes for a in arrays if a is not None)
+
+    def side(self):
+        """The "type" column as a compact categorical (int8 codes)."""
+        return pd.Categorical.from_codes((~self.is_call).astype(np.int8), SIDE_CATEGORIES)
+
+    def take(self, index):
+        """Subset by boolean mask or positions (copies, like any fancy index)."""
+        chain = OptionChain(*(getattr(self, f)[index] for f in self.FIELDS), float_dtype=self.strike.dtype)
+        for col in ("delta_exp", "gamma_exp"):
+            if getattr(self, col) is not None:
+                setattr(chain, col, getattr(self, col)[index])
+        return chain
+
+    def to_frame(self):
+        """DataFrame over the same arrays (strike / oi / iv / dte / type [+ exposures])."""
+        data = {
+            "strike": self.strike,
+            "oi": self.oi,
+            "iv": self.iv,
+            "dte": self.dte,
+            "type": self.side(),
+        }
+        for col in ("delta_exp", "gamma_exp"):
+            if getattr(self, col) is not None:
+                data[col] = getattr(self, col)
+        return pd.DataFrame(data, copy=False)
+
+    def __repr__(self):
+        return f"OptionChain({len(self)} contracts, {self.nbytes} bytes)"
@@ -0,0 +1,104 @@
+import argparse
+import sys
+import time
+
+import instrument
+import main as snapshot
+import append_snapshots_to_raw
+import postprocess
+from storage import get_storage
+
+# ================= STAGES =================
+# snapshot -> append -> postprocess -> summary, in one process:
+# one storage backend (one authenticated Sheets client, one spreadsheet
+# handle) is shared by every stage and frames are handed over in memory.
+STAGES = ["snapshot", "append", "postprocess", "summary"]
+
+
+class PipelineState:
+    def __init__(self, storage=None):
+        self._storage = storage
+        self.snapshots = None     # rows built by the snapshot stage
+        self.enriched = None      # raw_daily frame after postprocess
+        self.failed = False
+
+    @property
+    def storage(self):
+        # created on first use, so a snapshot-only run never authenticates
+        if self._storage is None:
+            self._storage = get_storage()
+        return self._storage
+
+
+def stage_snapshot(state, args):
+    symbols = snapshot.load_symbols(args.symbols, args.symbols_file)
+    report, state.snapshots = snapshot.run_universe(
+        symbols,
+        workers=args.workers,
+        replay=args.replay,
+        market_date=args.date,
+        provider=args.provider,
+    )
+    snapshot.print_run_report(report)
+    if len(report) and (report["status"] == "failed").all():
+        state.failed = True
+
+
+def stage_append(state, args):
+    append_snapshots_to_raw.main(state.storage, snapshots=state.snapshots)
+
+
+def stage_postprocess(state, args):
+    state.enriched = postprocess.process(state.storage)
+
+
+def stage_summary(state, args):
+    df = state.enriched
+    if df is None:
+        df = state.storage.load_raw()
+    if df.empty:
+        print("[SKIP] daily_summary — no raw rows")
+        return
+    postprocess.write_daily_summary(df, state.storage)
+
+
+STAGE_FUNCS = {
+    "snapshot": stage_snapshot,
+    "append": stage_append,
+    "postprocess": stage_postprocess,
+    "summary": stage_summary,
+}
+
+
+def run_pipeline(stages, args, storage=None):
+    state = PipelineState(storage)
+    profile_stage = getattr(args, "profile", None)
+    for name in STAGES:
+        if name not in stages:
+            continue
+        start = time.perf_counter()
+        print(f"[STAGE] {name}")
+        with instrument.span(f"stage.{name}"), instrument.profile(name, enabled=name == profile_stage):
+            STAGE_FUNCS[name](state, args)
+        print(f"[STAGE] {name} done in {time.perf_counter() - start:.1f}s")
+    return state
+
+
+# ================= ENTRY =================
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Options gamma daily pipeline")
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES,
+                        help="stages to run (always executed in pipeline order)")
+    parser.add_argument("--profile", choices=STAGES,
+                        help="write a cProfile dump of this stage to data/reports/")
+    snapshot.add_run_arguments(parser)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    state = run_pipeline(args.stages, args)
+    instrument.write_report(entry="pipeline", stages=args.stages, failed=state.failed)
+
+    if state.failed:
+        sys.exit(1)
@@ -1,98 +1,19 @@
-import os
-import json
 import numpy as np
 import pandas as pd
-import gspread
 from datetime import datetime
-from google.oauth2.service_account import Credentials
 from pathlib import Path
-import uuid
 
-PIPELINE_VERSION = "v1.1.0"
-RUN_ID = str(uuid.uuid4())
-CREATED_AT_UTC = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+from forward_metrics import HORIZONS, fill_forward_returns
+from storage import get_storage
+from event_index import EventIndex
+import instrument
+from run_meta import CREATED_AT_UTC, PIPELINE_VERSION, RUN_ID
 
 # ================= CONFIG =================
-SPREADSHEET_NAME = "Options Gamma Log"
-RAW_SHEET = "raw_daily"
-SUMMARY_SHEET = "daily_summary"
 CALENDAR_PATH = Path("data/calendars")
 
-# ================= AUTH =================
-def get_client():
-    creds_json = json.loads(os.environ["GOOGLE_SHEETS_CREDENTIALS"])
-    scopes = [
-        "https://www.googleapis.com/auth/spreadsheets",
-        "https://www.googleapis.com/auth/drive",
-    ]
-    creds = Credentials.from_service_account_info(creds_json, scopes=scopes)
-    return gspread.authorize(creds)
-
-# ================= LOAD RAW =================
-def load_raw():
-    gc = get_client()
-    ws = gc.open(SPREADSHEET_NAME).worksheet(RAW_SHEET)
-
-    values = ws.get_all_values()
-    if len(values) < 2:
-        return pd.DataFrame(), ws, []
-
-    headers = [h.strip().lower() for h in values[0]]
-    rows = values[1:]
-
-    df = pd.DataFrame(rows, columns=headers)
-    return df, ws, headers
-
-# ================= LOAD SUMMARY =================
-def load_summary_df():
-    gc = get_client()
-    ws = gc.open(SPREADSHEET_NAME).worksheet(SUMMARY_SHEET)
-
-    values = ws.get_all_values()
-    if len(values) < 2:
-        return pd.DataFrame(), ws
-
-    headers = [h.strip().lower() for h in values[0]]
-    rows = values[1:]
-
-    df = pd.DataFrame(rows, columns=headers)
-    return df, ws
-
-# ================= EVENT CALENDAR =================
-def load_event_calendar():
-    events = {}
-    for file in ["fomc.csv", "cpi.csv", "opex.csv"]:
-        path = CALENDAR_PATH / file
-        if not path.exists():
-            continue
-        df = pd.read_csv(path)
-        for _, r in df.iterrows():
-            events[str(r["date"])] = r["event"]
-    return events
-
-def resolve_event(market_date, events):
-    if market_date in events:
-        return True, events[market_date]
-    return False, "NONE"
-
-def resolve_event_phase(market_date, events):
-    if not events:
-        return "NONE"
-
-    market_dt = pd.to_datetime(market_date)
-    event_dates = sorted(pd.to_datetime(list(events.keys())))
-
-    if market_dt in event_dates:
-        return "EVENT"
-
-    for d in event_dates:
-        if market_dt < d:
-            return "PRE_EVENT"
-
-    return "POST_EVENT"
-
 # ================= FORWARD METRICS =================
-def enrich_forward_metrics(df):
+def enrich_forward_metrics(df, horizons=HORIZONS):
     df = df.copy()
 
     df["spot"] = pd.to_numeric(df["spot"], errors="coerce")
@@ -101,30 +22,7 @@ def enrich_forward_metrics(df):
     df = df.dropna(subset=["spot", "date_dt"])
     df = df.sort_values(["symbol", "date_dt"])
 
-    for n in [1, 2, 5]:
-        for col in [f"close_t+{n}", f"ret_t+{n}", f"days_to_close_t+{n}"]:
-            if col not in df.columns:
-                df[col] = ""
-
-    for symbol, g in df.groupby("symbol"):
-        g = g.reset_index()
-        for i, row in g.iterrows():
-            base_idx = row["index"]
-
-            for n in [1, 2, 5]:
-                if i + n >= len(g):
-                    continue
-
-                future_spot = g.loc[i + n, "spot"]
-
-                if df.at[base_idx, f"close_t+{n}"] in ["", None]:
-                    df.at[base_idx, f"close_t+{n}"] = future_spot
-
-                if df.at[base_idx, f"ret_t+{n}"] in ["", None]:
-                    df.at[base_idx, f"ret_t+{n}"] = future_spot / row["spot"] - 1
-
-                if df.at[base_idx, f"days_to_close_t+{n}"] in ["", None]:
-                    df.at[base_idx, f"days_to_close_t+{n}"] = n
+    df = fill_forward_returns(df, horizons)
 
     df["data_ok"] = (
         df.groupby("date")["symbol"]
@@ -250,34 +148,7 @@ def sanitize_for_sheets(df):
     return df
 
 
-# ================= WRITE BACK (SAFE) =================
-def batch_write(df, ws, headers):
-    header_map = {h: i for i, h in enumerate(headers)}
-    updates = []
-
-    for idx, row in df.iterrows():
-        sheet_row = idx + 2
-        updated = ws.row_values(sheet_row)
-        updated += [""] * (len(headers) - len(updated))
-
-        for col, val in row.items():
-            if col not in header_map:
-                continue
-            if val in ["", None]:
-                continue
-            updated[header_map[col]] = val
-
-        updates.append({
-            "range": f"A{sheet_row}",
-            "values": [updated],
-        })
-
-    if updates:
-        ws.batch_update(updates, value_input_option="USER_ENTERED")
-        print(f"[OK] Updated {len(updates)} rows")
-
-
-def write_daily_summary(df):
+def write_daily_summary(df, storage):
     df = df.copy()
 
     df["date_dt"] = pd.to_datetime(df["date"], errors="coerce")
@@ -291,7 +162,7 @@ def write_daily_summary(df):
     dominant = counts.idxmax()
     share = round(counts.max() / counts.sum(), 2)
 
-    summary_df, ws = load_summary_df()
+    summary_df = storage.load_summary()
     if not summary_df.empty:
         summary_df["date_dt"] = pd.to_datetime(summary_df["date"], errors="coerce")
         if last_market_date <= summary_df["date_dt"].max().date():
@@ -300,54 +171,38 @@ def write_daily_summary(df):
     # ⏱️ TIMESTAMP PIPELINE (UTC)
     created_at = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
 
-    # HEADER (tylko gdy arkusz pusty)
-    if ws.get_all_values() == []:
-        ws.append_row(
-            ["date", "dominant_regime", "share", "symbols", "created_at_utc"],
-            value_input_option="RAW"
-        )
-
-    ws.append_row(
-        [
-            last_market_date.strftime("%Y-%m-%d"),
-            dominant,
-            share,
-            len(day_df),
-            created_at,
-        ],
-        value_input_option="RAW"
-    )   
+    storage.append_summary({
+        "date": last_market_date.strftime("%Y-%m-%d"),
+        "dominant_regime": dominant,
+        "share": share,
+        "symbols": len(day_df),
+        "created_at_utc": created_at,
+    })
 
-    
 
 # ================= ENTRY =================
-def main():
-    df, ws, headers = load_raw()
+def process(storage):
+    """Enriches raw_daily and writes it back; returns the enriched frame."""
+    with instrument.span("postprocess.load_raw"):
+        df = storage.load_raw()
+    instrument.count("postprocess.rows", len(df))
     if df.empty:
-        return
+        return df
+    raw = df.copy()
+
+    with instrument.span("postprocess.enrich"):
+        df = enrich_forward_metrics(df)
+        df = cast_numeric(df)
+
+        # EVENTS (one searchsorted pass over the whole frame)
+        EventIndex.from_calendars(CALENDAR_PATH).annotate(df)
 
-    df = enrich_forward_metrics(df)
-    df = cast_numeric(df)
-
-    # EVENTS
-    events = load_event_calendar()
-    df["is_event_day"] = False
-    df["event_type"] = "NONE"
-    df["event_phase"] = "NONE"
-
-    for date, g in df.groupby("date"):
-        is_event, event_type = resolve_event(date, events)
-        event_phase = resolve_event_phase(date, events)
-        df.loc[g.index, "is_event_day"] = is_event
-        df.loc[g.index, "event_type"] = event_type
-        df.loc[g.index, "event_phase"] = event_phase
-
-    # === INSTITUTIONAL BLOCKS ===
-    df = add_intraday_structure(df)
-    df = add_streaks(df)
-    df = add_cross_symbol(df)
-    df = add_event_structure(df)
-    df = add_regime_quality(df)
+        # === INSTITUTIONAL BLOCKS ===
+        df = add_intraday_structure(df)
+        df = add_streaks(df)
+        df = add_cross_symbol(df)
+        df = add_event_structure(df)
+        df = add_regime_quality(df)
 
     # ================= PIPELINE METADATA =================
     df["created_at_utc"] = CREATED_AT_UTC
@@ -355,10 +210,20 @@ def main():
     df["run_id"] = RUN_ID
 
     df = sanitize_for_sheets(df)
-   
-     
-    batch_write(df, ws, headers)
-    write_daily_summary(df)
+
+    with instrument.span("postprocess.write"):
+        storage.update_raw(df, raw)
+    return df
+
+
+def main(storage=None):
+    storage = storage or get_storage()
+
+    df = process(storage)
+    if df.empty:
+        return
+    write_daily_summary(df, storage)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
+    instrument.write_report(entry="postprocess")
\ No newline at end of file
@@ -0,0 +1,167 @@
+import zlib
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import netio
+
+# ================= INTERFACE =================
+# A provider answers the three questions the pipeline asks the market:
+#   history(symbol, period)        -> frame with a "Close" column
+#   expiries(symbol)               -> ["YYYY-MM-DD", ...]
+#   option_chain(symbol, expiry)   -> (calls, puts) frames with
+#                                     strike / openInterest / impliedVolatility
+CHAIN_FIELDS = ["strike", "openInterest", "impliedVolatility"]
+
+
+class MarketDataProvider:
+    name = "base"
+
+    def history(self, symbol, period="5d"):
+        raise NotImplementedError
+
+    def expiries(self, symbol):
+        raise NotImplementedError
+
+    def option_chain(self, symbol, expiry):
+        raise NotImplementedError
+
+
+# ================= YFINANCE =================
+class YFinanceProvider(MarketDataProvider):
+    """yfinance behind netio: per-host limits, token bucket and retries on 429s."""
+    name = "yfinance"
+    host = "yahoo"
+
+    def __init__(self):
+        self._tickers = {}
+
+    def _ticker(self, symbol):
+        import yfinance as yf
+
+        if symbol not in self._tickers:
+            self._tickers[symbol] = yf.Ticker(symbol)
+        return self._tickers[symbol]
+
+    def history(self, symbol, period="5d"):
+        return netio.call(self.host, self._ticker(symbol).history, period=period)
+
+    def expiries(self, symbol):
+        # .options is a property that hits the network
+        return list(netio.call(self.host, lambda: self._ticker(symbol).options))
+
+    def option_chain(self, symbol, expiry):
+        chain = netio.call(self.host, self._ticker(symbol).option_chain, expiry)
+        return chain.calls, chain.puts
+
+
+# ================= LOCAL (FILES / SYNTHETIC) =================
+FIXTURES_PATH = Path("data/fixtures")
+
+
+def synthetic_chain(spot, dte, rng, strike_range=0.2, strike_step=None, base_iv=0.2):
+    """
+    One expiry of a realistic-looking chain: strikes around spot, a put
+    skewed smile that steepens into expiry, OI peaking near the money and
+    on round strikes. Returns (calls, puts) in yfinance's column layout.
+    """
+    if strike_step is None:
+        strike_step = 0.5 if spot < 50 else 1.0 if spot < 200 else 5.0
+    strikes = np.arange(
+        np.floor(spot * (1 - strike_range) / strike_step) * strike_step,
+        spot * (1 + strike_range) + strike_step,
+        strike_step,
+    )
+
+    t = max(dte, 1) / 365
+    m = np.log(strikes / spot) / np.sqrt(t)
+    smile = base_iv * (1 + 0.08 * m * m - 0.12 * m)
+    round_boost = np.where(np.isclose(strikes % (strike_step * 5), 0), 2.5, 1.0)
+    atm = np.exp(-0.5 * (np.log(strikes / spot) / (0.05 + 0.3 * np.sqrt(t))) ** 2)
+
+    def side(put):
+        skew = np.where(strikes < spot, 1.3, 0.7) if put else np.where(strikes > spot, 1.3, 0.7)
+        oi = rng.poisson(2000 * atm * round_boost * skew / np.sqrt(max(dte, 1)) + 1)
+        oi[rng.random(len(strikes)) < 0.05] = 0
+        iv = np.clip(smile * rng.normal(1, 0.02, len(strikes)), 0.01, None)
+        return pd.DataFrame({
+            "strike": strikes,
+            "openInterest": oi.astype(float),
+            "impliedVolatility": iv,
+        })
+
+    return side(False), side(True)
+
+
+class LocalProvider(MarketDataProvider):
+    """
+    Offline provider. Reads fixtures when present:
+        {root}/{symbol}/history.csv            (Date, Close)
+        {root}/{symbol}/chains/{expiry}.csv    (side, strike, openInterest, impliedVolatility)
+    and otherwise synthesizes a deterministic chain per (symbol, seed).
+    """
+    name = "local"
+
+    def __init__(self, root=FIXTURES_PATH, seed=0, now=None):
+        self.root = Path(root)
+        self.seed = seed
+        self.now = now
+
+    def _rng(self, symbol, *salt):
+        key = "|".join([symbol, *map(str, salt)]).encode()
+        return np.random.default_rng([self.seed, zlib.crc32(key)])
+
+    def _today(self):
+        return (self.now or datetime.utcnow()).date()
+
+    def _spot(self, symbol):
+        return float(np.round(self._rng(symbol).uniform(20, 600), 2))
+
+    def history(self, symbol, period="5d"):
+        path = self.root / symbol / "history.csv"
+        if path.exists():
+            return pd.read_csv(path, index_col=0)
+
+        days = int(period.rstrip("d")) if period.endswith("d") else 5
+        index = pd.bdate_range(end=self._today(), periods=days)
+        walk = self._rng(symbol, "history").normal(0, 0.01, days).cumsum()
+        # random walk that ends exactly at the synthetic spot
+        close = self._spot(symbol) * np.exp(walk - walk[-1])
+        return pd.DataFrame({"Close": close}, index=index)
+
+    def expiries(self, symbol):
+        chains = self.root / symbol / "chains"
+        if chains.exists():
+            return sorted(p.stem for p in chains.glob("*.csv"))
+
+        today = self._today()
+        # dailies for two weeks, then Friday weeklies out to ~3 months
+        days = [today + timedelta(days=d) for d in range(1, 15)]
+        days += [today + timedelta(days=d) for d in range(15, 95) if (today + timedelta(days=d)).weekday() == 4]
+        return [d.strftime("%Y-%m-%d") for d in days if d.weekday() < 5]
+
+    def option_chain(self, symbol, expiry):
+        path = self.root / symbol / "chains" / f"{expiry}.csv"
+        if path.exists():
+            df = pd.read_csv(path)
+            return (
+                df[df["side"] == "call"][CHAIN_FIELDS].reset_index(drop=True),
+                df[df["side"] == "put"][CHAIN_FIELDS].reset_index(drop=True),
+            )
+
+        dte = (datetime.strptime(expiry, "%Y-%m-%d").date() - self._today()).days
+        return synthetic_chain(self._spot(symbol), dte, self._rng(symbol, expiry))
+
+
+# ================= REGISTRY =================
+PROVIDERS = {
+    "yfinance": YFinanceProvider,
+    "local": LocalProvider,
+}
+
+
+def get_provider(name="yfinance", **kwargs):
+    if name not in PROVIDERS:
+        raise ValueError(f"Unknown market data provider: {name}")
+    return PROVIDERS[name](**kwargs)
@@ -0,0 +1,9 @@
+import uuid
+from datetime import datetime
+
+# ================= RUN METADATA =================
+# One value per process: stamped on enriched RAW rows (postprocess) and
+# on run reports / profiles (instrument).
+PIPELINE_VERSION = "v1.1.0"
+RUN_ID = str(uuid.uuid4())
+CREATED_AT_UTC = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
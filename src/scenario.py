@@ -0,0 +1,157 @@
+import numpy as np
+from scipy.special import ndtr
+
+from greeks import SQRT_2PI, valid_inputs, chain_arrays
+
+# ================= CONFIG =================
+# The one Black-Scholes engine of the pipeline: exposures() backs
+# compute_greeks, surface() backs DNZ / EGP / gamma flip.
+# Same formulas as py_vollib.black_scholes.greeks.analytical
+# (delta = N(d1) / N(d1) - 1, gamma = n(d1) / (S * sigma * sqrt(t))).
+# Agreement with py_vollib on priceable contracts: delta within 1e-9
+# absolute, gamma within 1e-9 relative (observed ~1e-15; the only
+# difference is the normal CDF implementation). Contracts with t <= 0 or
+# iv <= 0 are mapped to 0 instead of py_vollib's NaN / limit values.
+GREEKS_TOLERANCE = 1e-9
+
+# Memory cap for one (prices x contracts) block of float64 temporaries.
+SCENARIO_MAX_BYTES = 64 * 1024 * 1024
+
+# float64 arrays alive at once while pricing one block (d1, cdf, pdf, product)
+_BLOCK_ARRAYS = 4
+
+
+# ================= SURFACE =================
+class Surface:
+    """
+    Chain aggregates at every scenario price:
+
+    net_delta     — sum(delta * oi * dte_weight)
+    net_gamma     — sum(gamma * oi * dte_weight) = d(net_delta) / d(price)
+    signed_gamma  — same with puts counted negative (dealers long calls,
+                    short puts); its zero crossing is the gamma flip
+    """
+
+    def __init__(self, prices, net_delta, net_gamma, signed_gamma):
+        self.prices = prices
+        self.net_delta = net_delta
+        self.net_gamma = net_gamma
+        self.signed_gamma = signed_gamma
+
+    def __len__(self):
+        return len(self.prices)
+
+    def __getitem__(self, idx):
+        return Surface(self.prices[idx], self.net_delta[idx], self.net_gamma[idx], self.signed_gamma[idx])
+
+
+# ================= ENGINE =================
+class ChainScenario:
+    """
+    Per-contract Black-Scholes invariants (log strike, drift, sigma*sqrt(t),
+    weights) computed once per chain. Any number of price scenarios, and
+    the per-contract exposures at spot, are evaluated from them without
+    another pass over the DataFrame.
+    """
+
+    def __init__(self, is_call, strike, t, iv, weight, r):
+        self.size = len(strike)
+        # contracts priceable at any positive spot; the rest stay at 0
+        self.ok = valid_inputs(1.0, strike, t, iv) & np.isfinite(weight)
+
+        is_call, strike, t, iv, weight = (
+            is_call[self.ok], strike[self.ok], t[self.ok], iv[self.ok], weight[self.ok]
+        )
+        self.is_call = is_call
+        self.weight = weight
+        self.log_k = np.log(strike)
+        self.drift = (r + 0.5 * iv * iv) * t
+        self.sig_sqrt_t = iv * np.sqrt(t)
+
+        # put delta = N(d1) - 1  ->  constant offset of -sum(put weights)
+        self.put_offset = -weight[~is_call].sum()
+        # gamma weights: [all contracts, puts negative]
+        gamma_weight = weight / self.sig_sqrt_t
+        self.gamma_weights = np.column_stack([gamma_weight, np.where(is_call, gamma_weight, -gamma_weight)])
+
+    @classmethod
+    def from_chain(cls, df, r):
+        return cls(*chain_arrays(df), r)
+
+    def _d1(self, log_s):
+        return (log_s - self.log_k + self.drift) / self.sig_sqrt_t
+
+    def exposures(self, spot):
+        """Per-contract (delta_exp, gamma_exp) at spot, aligned with the chain rows."""
+        delta_exp = np.zeros(self.size)
+        gamma_exp = np.zeros(self.size)
+        if not (np.isfinite(spot) and spot > 0):
+            return delta_exp, gamma_exp
+
+        d1 = self._d1(np.log(spot))
+        cdf = ndtr(d1)
+        delta_exp[self.ok] = np.where(self.is_call, cdf, cdf - 1.0) * self.weight
+        gamma_exp[self.ok] = np.exp(-0.5 * d1 * d1) / SQRT_2PI * self.gamma_weights[:, 0] / spot
+        return delta_exp, gamma_exp
+
+    def contract_grid(self, prices):
+        """
+        Per-contract (delta_exp, gamma_exp) at every price, shape
+        (prices, priceable contracts) — columns follow chain[self.ok].
+        No memory cap: meant for small sets of changed contracts.
+        """
+        prices = np.asarray(prices, dtype=np.float64)
+        d1 = self._d1(np.log(prices)[:, None])
+        cdf = ndtr(d1)
+        delta_exp = np.where(self.is_call, cdf, cdf - 1.0) * self.weight
+        gamma_exp = np.exp(-0.5 * d1 * d1) / SQRT_2PI * self.gamma_weights[:, 0] / prices[:, None]
+        return delta_exp, gamma_exp
+
+    def surface(self, prices, max_bytes=SCENARIO_MAX_BYTES):
+        """
+        Net delta / net gamma / signed gamma at every price, evaluated as
+        a price x contract matrix in row blocks of at most max_bytes.
+        Prices <= 0 are unpriceable and stay at 0.
+        """
+        prices = np.asarray(prices, dtype=np.float64)
+        net_delta = np.zeros(len(prices))
+        gamma = np.zeros((len(prices), 2))
+        if not len(self.log_k):
+            return Surface(prices, net_delta, gamma[:, 0], gamma[:, 1])
+
+        priced = np.isfinite(prices) & (prices > 0)
+        log_s = np.log(prices[priced])
+        delta_part = np.full(len(log_s), self.put_offset)
+        gamma_part = np.zeros((len(log_s), 2))
+
+        block = max(1, int(max_bytes // (8 * _BLOCK_ARRAYS * len(self.log_k))))
+        for start in range(0, len(log_s), block):
+            rows = slice(start, start + block)
+            d1 = self._d1(log_s[rows, None])
+            delta_part[rows] += ndtr(d1) @ self.weight
+            gamma_part[rows] = np.exp(-0.5 * d1 * d1) @ self.gamma_weights
+
+        net_delta[priced] = delta_part
+        gamma[priced] = gamma_part / SQRT_2PI / prices[priced, None]
+        return Surface(prices, net_delta, gamma[:, 0], gamma[:, 1])
+
+
+# ================= LEVELS =================
+def zero_crossing(prices, values, spot):
+    """
+    Price where `values` changes sign, linearly interpolated between grid
+    points; the crossing closest to spot wins. NaN when there is none.
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64)
+
+    sign = np.sign(values)
+    cross = np.flatnonzero(sign[:-1] * sign[1:] < 0)
+    exact = np.flatnonzero(values == 0)
+    if not len(cross) and not len(exact):
+        return np.nan
+
+    lo, hi = values[cross], values[cross + 1]
+    levels = prices[cross] + (prices[cross + 1] - prices[cross]) * lo / (lo - hi)
+    levels = np.concatenate([levels, prices[exact]])
+    return levels[np.argmin(np.abs(levels - spot))]
@@ -0,0 +1,231 @@
+import os
+import json
+import math
+import numpy as np
+import pandas as pd
+import gspread
+from google.oauth2.service_account import Credentials
+
+import instrument
+
+# Google Sheets plumbing shared by storage.SheetsStorage and the CLI
+# scripts: auth, RAW key scan, schema-safe append, diff write-back.
+
+
+# ================= AUTH =================
+def get_client():
+    creds_json = json.loads(os.environ["GOOGLE_SHEETS_CREDENTIALS"])
+    scopes = [
+        "https://www.googleapis.com/auth/spreadsheets",
+        "https://www.googleapis.com/auth/drive",
+    ]
+    creds = Credentials.from_service_account_info(creds_json, scopes=scopes)
+    return gspread.authorize(creds)
+
+
+# ================= LOAD EXISTING RAW =================
+def load_existing_keys_and_header(ws, expected_header):
+    header = [h.strip().lower() for h in ws.row_values(1)]
+
+    if not header:
+        raise RuntimeError("❌ RAW sheet is empty — header required")
+
+    # 🔒 HARD SCHEMA GUARD — JEDYNE MIEJSCE
+    if header != expected_header:
+        raise RuntimeError(
+            "❌ RAW_DAILY SCHEMA DRIFT — STOP APPEND\n"
+            f"Expected: {expected_header}\n"
+            f"Found:    {header}"
+        )
+
+    # only the key columns are downloaded, not the whole sheet
+    date_col = gspread.utils.rowcol_to_a1(1, header.index("date") + 1).rstrip("1")
+    symbol_col = gspread.utils.rowcol_to_a1(1, header.index("symbol") + 1).rstrip("1")
+    dates, symbols = ws.batch_get([f"{date_col}2:{date_col}", f"{symbol_col}2:{symbol_col}"])
+
+    dates = [r[0] if r else "" for r in dates]
+    symbols = [r[0] if r else "" for r in symbols]
+    n = max(len(dates), len(symbols))
+    dates += [""] * (n - len(dates))
+    symbols += [""] * (n - len(symbols))
+
+    keys = {(d, s) for d, s in zip(dates, symbols) if d or s}
+
+    # next free row (1-indexed): header + data rows
+    start_row = n + 2
+
+    return keys, header, start_row
+
+
+# ================= CLEAN CELL =================
+def clean_value(x):
+    if x is None:
+        return ""
+    if isinstance(x, float):
+        if math.isnan(x) or math.isinf(x):
+            return ""
+        return float(x)
+    return x
+
+
+# ================= SAFE APPEND =================
+# rows per rectangular range written in one request
+APPEND_CHUNK_ROWS = 2000
+
+
+def append_rows_strict(ws, rows, header, start_row):
+    if not rows:
+        print("[OK] Nothing to append")
+        return
+
+    end_row = start_row + len(rows) - 1
+    if end_row > ws.row_count:
+        ws.add_rows(end_row - ws.row_count)
+
+    last_col = len(header)
+    requests = 0
+    for i in range(0, len(rows), APPEND_CHUNK_ROWS):
+        block = rows[i:i + APPEND_CHUNK_ROWS]
+        first = start_row + i
+        last = first + len(block) - 1
+        ws.batch_update(
+            [{
+                "range": (
+                    f"{gspread.utils.rowcol_to_a1(first, 1)}:"
+                    f"{gspread.utils.rowcol_to_a1(last, last_col)}"
+                ),
+                "values": [[("" if v is None else v) for v in r] for r in block],
+            }],
+            value_input_option="USER_ENTERED",
+        )
+        requests += 1
+
+    instrument.count("sheets.range_writes", requests)
+    instrument.count("sheets.cells_written", len(rows) * last_col)
+    print(f"[OK] Appended {len(rows)} new raw rows (schema-safe, {requests} range writes)")
+
+
+# ================= WRITE BACK (DIFF) =================
+# one batch_update request carries at most this many cells
+WRITE_CHUNK_CELLS = 50_000
+
+
+def _cell_key(val):
+    """Comparable form of a cell: sheet strings and frame values alike."""
+    if val is None:
+        return ""
+    if hasattr(val, "item"):
+        val = val.item()
+    if isinstance(val, bool):
+        return "TRUE" if val else "FALSE"
+    if isinstance(val, (int, float)):
+        return float(val)
+    text = str(val).strip()
+    try:
+        return float(text.replace(",", ""))
+    except ValueError:
+        return text.upper() if text.upper() in ("TRUE", "FALSE") else text
+
+
+def _changed(old, new):
+    a, b = _cell_key(old), _cell_key(new)
+    if isinstance(a, float) and isinstance(b, float):
+        # sheet shows formatted numbers; ignore display rounding
+        return not np.isclose(a, b, rtol=1e-6, atol=1e-9)
+    return a != b
+
+
+def _plain(val):
+    return val.item() if hasattr(val, "item") else val
+
+
+def diff_cells(df, raw, headers):
+    """
+    (row_pos, col_pos, value) for every cell of `df` that differs from the
+    values load_raw fetched. Empty values never overwrite the sheet.
+    """
+    header_map = {h: i for i, h in enumerate(headers)}
+    cells = []
+
+    for col in df.columns:
+        if col not in header_map:
+            continue
+        new = df[col]
+        old = raw[col].reindex(new.index) if col in raw.columns else pd.Series("", index=new.index)
+
+        for idx, val, prev in zip(new.index, new.to_numpy(), old.to_numpy()):
+            if val is None or (isinstance(val, str) and val == ""):
+                continue
+            if _changed(prev, val):
+                cells.append((idx, header_map[col], _plain(val)))
+
+    return cells
+
+
+def coalesce_ranges(cells):
+    """
+    Packs changed cells into rectangles: contiguous columns per row first,
+    then identical column spans on consecutive rows are stacked.
+    """
+    by_row = {}
+    for row, col, val in cells:
+        by_row.setdefault(row, {})[col] = val
+
+    segments = []
+    for row in sorted(by_row):
+        cols = sorted(by_row[row])
+        start = prev = cols[0]
+        for c in cols[1:] + [None]:
+            if c is not None and c == prev + 1:
+                prev = c
+                continue
+            segments.append((row, start, prev, [by_row[row][k] for k in range(start, prev + 1)]))
+            if c is not None:
+                start = prev = c
+
+    # open rectangle per column span; a row extends the one ending at row - 1
+    blocks, open_blocks = [], {}
+    for row, c0, c1, values in segments:
+        block = open_blocks.get((c0, c1))
+        if block and block["r1"] == row - 1:
+            block["r1"] = row
+            block["values"].append(values)
+        else:
+            block = {"r0": row, "r1": row, "c0": c0, "c1": c1, "values": [values]}
+            blocks.append(block)
+            open_blocks[(c0, c1)] = block
+
+    return blocks
+
+
+def batch_write(df, ws, headers, raw):
+    """
+    Sends only the cells that changed against `raw` (the frame load_raw
+    returned), coalesced into rectangular ranges, in as few batch_update
+    calls as the chunk size allows.
+    """
+    blocks = coalesce_ranges(diff_cells(df, raw, headers))
+    if not blocks:
+        print("[OK] Nothing to update")
+        return
+
+    updates, chunks, size = [], [], 0
+    for b in blocks:
+        # frame row i lives on sheet row i + 2 (header + 1-indexing)
+        start = gspread.utils.rowcol_to_a1(b["r0"] + 2, b["c0"] + 1)
+        end = gspread.utils.rowcol_to_a1(b["r1"] + 2, b["c1"] + 1)
+        updates.append({"range": f"{start}:{end}", "values": b["values"]})
+        size += len(b["values"]) * len(b["values"][0])
+        if size >= WRITE_CHUNK_CELLS:
+            chunks.append(updates)
+            updates, size = [], 0
+    if updates:
+        chunks.append(updates)
+
+    for chunk in chunks:
+        ws.batch_update(chunk, value_input_option="USER_ENTERED")
+
+    n_cells = sum(len(b["values"]) * len(b["values"][0]) for b in blocks)
+    instrument.count("sheets.cells_written", n_cells)
+    instrument.count("sheets.range_writes", len(blocks))
+    print(f"[OK] Updated {n_cells} cells in {len(blocks)} ranges ({len(chunks)} requests)")
@@ -0,0 +1,200 @@
+import argparse
+import re
+import time
+import uuid
+import pandas as pd
+from pathlib import Path
+
+# ================= CONFIG =================
+# data/store/snapshots/date=YYYY-MM-DD/part-<time_ns>-<id>.parquet
+STORE_PATH = Path("data/store/snapshots")
+LEGACY_PATH = Path("data/snapshots")
+LEGACY_PATTERN = re.compile(r"^(\d{4}-\d{2}-\d{2})_([A-Za-z0-9.\-^=]+)\.csv$")
+
+KEY = ["date", "symbol"]
+
+TEXT_COLUMNS = [
+    "date", "week", "symbol", "timestamp",
+    "spot_bucket", "gamma_bucket", "regime", "event_flag",
+]
+FLOAT_COLUMNS = [
+    "spot",
+    "dnz_low", "dnz_mid", "dnz_high", "dnz_width",
+    "spot_position",
+    "gamma_above", "gamma_below", "gamma_total", "gamma_diff", "gamma_ratio",
+    "gamma_asym_strength", "effective_gamma_pressure", "egp_normalized",
+    "gamma_peak_price", "gamma_concentration", "gamma_distance_from_spot",
+    "gamma_flip",
+    "close_t+1", "close_t+2", "close_t+5",
+]
+
+
+# ================= TYPING =================
+def normalize(df):
+    """Snapshot rows with the store's column types ("" -> NaN for floats)."""
+    df = df.copy()
+    df.columns = [c.strip().lower() for c in df.columns]
+
+    for col in FLOAT_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype("float64")
+    for col in TEXT_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].fillna("").astype(str).astype("string")
+    # any extra column keeps whatever type it came with
+
+    return df
+
+
+# ================= WRITE =================
+def partition_path(market_date, root=STORE_PATH):
+    return Path(root) / f"date={market_date}"
+
+
+def append(df, root=STORE_PATH):
+    """
+    Append snapshot rows. Each date gets one new immutable part file, so
+    appends never rewrite existing data and concurrent writers never
+    collide. Later parts win on duplicate (date, symbol) keys.
+    """
+    if df is None or df.empty:
+        return []
+
+    df = normalize(df)
+    written = []
+    for market_date, part in df.groupby("date", sort=True):
+        folder = partition_path(market_date, root)
+        folder.mkdir(parents=True, exist_ok=True)
+
+        name = f"part-{time.time_ns()}-{uuid.uuid4().hex[:8]}.parquet"
+        tmp = folder / f".{name}.tmp"
+        part.drop(columns=["date"]).to_parquet(tmp, index=False, compression="zstd")
+        tmp.replace(folder / name)
+        written.append(folder / name)
+
+    return written
+
+
+def compact(market_date, root=STORE_PATH, key=KEY):
+    """Merge all parts of one date into a single de-duplicated part."""
+    parts = part_files(market_date, root)
+    if len(parts) <= 1:
+        return
+
+    append(_read_parts(market_date, parts, key=key), root)
+    for p in parts:
+        p.unlink()
+
+
+# ================= READ =================
+def partitions(root=STORE_PATH):
+    """Sorted market dates present in the store."""
+    root = Path(root)
+    if not root.exists():
+        return []
+    return sorted(
+        p.name.split("=", 1)[1]
+        for p in root.glob("date=*")
+        if p.is_dir()
+    )
+
+
+def part_files(market_date, root=STORE_PATH):
+    # part names start with time_ns, so lexical order == write order
+    return sorted(partition_path(market_date, root).glob("part-*.parquet"))
+
+
+def _read_parts(market_date, parts, columns=None, key=KEY):
+    frames = [pd.read_parquet(p, columns=columns) for p in parts]
+    df = pd.concat(frames, ignore_index=True)
+    df.insert(0, "date", market_date)
+    return normalize(df).drop_duplicates(subset=key, keep="last")
+
+
+def read(symbols=None, start=None, end=None, columns=None, root=STORE_PATH, key=KEY):
+    """
+    Snapshot rows for a symbol set and an inclusive [start, end] date
+    range. Only the partitions inside the range are opened. `key` is the
+    row identity (intraday stores add "timestamp").
+    """
+    dates = [
+        d for d in partitions(root)
+        if (start is None or d >= str(start)) and (end is None or d <= str(end))
+    ]
+    if columns is not None:
+        columns = [c for c in columns if c != "date"]
+        columns = [k for k in key if k != "date" and k not in columns] + columns
+
+    frames = []
+    for d in dates:
+        parts = part_files(d, root)
+        if not parts:
+            continue
+        df = _read_parts(d, parts, columns, key)
+        if symbols is not None:
+            df = df[df["symbol"].isin(list(symbols))]
+        frames.append(df)
+
+    if not frames:
+        return pd.DataFrame(columns=key)
+
+    return pd.concat(frames, ignore_index=True).sort_values(key, ignore_index=True)
+
+
+# ================= MIGRATION =================
+def migrate_csv_snapshots(src=LEGACY_PATH, root=STORE_PATH):
+    """
+    One-time import of legacy data/snapshots/{date}_{symbol}.csv files.
+    Keys already in the store are skipped, so re-running is harmless.
+    """
+    existing = read(columns=KEY, root=root)
+    existing = set(zip(existing["date"], existing["symbol"]))
+
+    frames = []
+    for file in sorted(Path(src).glob("*.csv")):
+        m = LEGACY_PATTERN.match(file.name)
+        if not m:
+            print(f"[SKIP] {file.name} — not a snapshot file")
+            continue
+        try:
+            df = pd.read_csv(file)
+        except Exception as e:
+            print(f"[SKIP] {file.name} — cannot read CSV ({e})")
+            continue
+
+        df.columns = [c.strip().lower() for c in df.columns]
+        if not set(KEY).issubset(df.columns):
+            print(f"[SKIP] {file.name} — missing columns {set(KEY) - set(df.columns)}")
+            continue
+
+        df["date"] = df["date"].astype(str)
+        df["symbol"] = df["symbol"].astype(str)
+        new = [k not in existing for k in zip(df["date"], df["symbol"])]
+        frames.append(df[new])
+
+    if not frames or not sum(len(f) for f in frames):
+        print("[OK] Nothing to migrate")
+        return 0
+
+    df = pd.concat(frames, ignore_index=True)
+    append(df, root)
+    for d in df["date"].unique():
+        compact(d, root)
+
+    print(f"[OK] Migrated {len(df)} snapshot rows into {root}")
+    return len(df)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Snapshot store maintenance")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("migrate", help="import legacy data/snapshots/*.csv files")
+    p_compact = sub.add_parser("compact", help="merge part files per date")
+    p_compact.add_argument("--date", help="single date (default: all)")
+    args = parser.parse_args()
+
+    if args.cmd == "migrate":
+        migrate_csv_snapshots()
+    elif args.cmd == "compact":
+        for d in [args.date] if args.date else partitions():
+            compact(d)
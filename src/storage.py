@@ -0,0 +1,422 @@
+import os
+import math
+import sqlite3
+import pandas as pd
+from pathlib import Path
+
+import instrument
+import netio
+import sheets
+
+# ================= SCHEMA =================
+EXPECTED_HEADER = [
+    "date","week","symbol","spot",
+    "dnz_low","dnz_mid","dnz_high","dnz_width",
+    "spot_position","spot_bucket","gamma_bucket","regime",
+    "gamma_above","gamma_below","gamma_total","gamma_diff","gamma_ratio",
+    "gamma_asym_strength","effective_gamma_pressure","egp_normalized",
+    "gamma_peak_price","gamma_concentration","gamma_distance_from_spot",
+
+    "close_t+1","close_t+2","close_t+5",
+    "ret_t+1","ret_t+2","ret_t+5",
+    "days_to_close_t+1","days_to_close_t+2","days_to_close_t+5",
+
+    "data_ok","event_flag",
+    "is_event_day","event_type","event_phase",
+
+    # === KROK A — INTRADAY STRUCTURE ===
+    "day_direction",
+    "range_expansion",
+    "close_location",
+
+    # === KROK B — STABILITY ===
+    "spot_bucket_streak",
+    "gamma_bucket_streak",
+    "regime_streak",
+
+    # === KROK C — CROSS SYMBOL ===
+    "symbols_same_spot_bucket",
+    "symbols_same_gamma_bucket",
+    "cross_symbol_alignment",
+
+    # === KROK D — EVENT × STRUCTURE ===
+    "event_structure_tag",
+    "event_risk_flag",
+
+    # === KROK E — QUALITY ===
+    "regime_quality_score",
+
+    # === PIPELINE METADATA ===
+    "created_at_utc",
+    "pipeline_version",
+    "run_id",
+
+]
+
+SUMMARY_HEADER = ["date", "dominant_regime", "share", "symbols", "created_at_utc"]
+
+KEY = ["date", "symbol"]
+
+# SQLite column types; everything not listed is TEXT
+REAL_COLUMNS = {
+    "spot",
+    "dnz_low", "dnz_mid", "dnz_high", "dnz_width", "spot_position",
+    "gamma_above", "gamma_below", "gamma_total", "gamma_diff", "gamma_ratio",
+    "gamma_asym_strength", "effective_gamma_pressure", "egp_normalized",
+    "gamma_peak_price", "gamma_concentration", "gamma_distance_from_spot",
+    "close_t+1", "close_t+2", "close_t+5",
+    "ret_t+1", "ret_t+2", "ret_t+5",
+    "share",
+}
+INTEGER_COLUMNS = {
+    "days_to_close_t+1", "days_to_close_t+2", "days_to_close_t+5",
+    "spot_bucket_streak", "gamma_bucket_streak", "regime_streak",
+    "symbols_same_spot_bucket", "symbols_same_gamma_bucket",
+    "regime_quality_score", "symbols",
+}
+BOOL_COLUMNS = {"data_ok", "is_event_day", "range_expansion"}
+
+
+# ================= INTERFACE =================
+class StorageBackend:
+    """
+    System of record for raw_daily and daily_summary.
+
+    load_raw()              -> frame with EXPECTED_HEADER columns, one row per (date, symbol)
+    existing_keys()         -> {(date, symbol), ...}
+    append_raw(rows)        -> append snapshot rows (caller drops existing keys)
+    update_raw(df, raw)     -> write back an enriched load_raw() frame; empty values
+                               never overwrite stored ones
+    load_summary()          -> daily_summary frame
+    append_summary(row)     -> add one daily_summary row (dict keyed by SUMMARY_HEADER)
+    target                  -> what is written to (e.g. "sqlite:/abs/gamma.db");
+                               scopes the RAW ingest manifest
+    """
+    name = "base"
+    header = EXPECTED_HEADER
+
+    @property
+    def target(self):
+        return self.name
+
+    def load_raw(self):
+        raise NotImplementedError
+
+    def existing_keys(self):
+        raise NotImplementedError
+
+    def append_raw(self, rows):
+        raise NotImplementedError
+
+    def update_raw(self, df, raw):
+        raise NotImplementedError
+
+    def load_summary(self):
+        raise NotImplementedError
+
+    def append_summary(self, row):
+        raise NotImplementedError
+
+
+# ================= GOOGLE SHEETS =================
+SPREADSHEET_NAME = "Options Gamma Log"
+RAW_SHEET = "raw_daily"
+SUMMARY_SHEET = "daily_summary"
+SHEETS_HOST = "sheets"
+
+
+class SheetsStorage(StorageBackend):
+    name = "sheets"
+
+    def __init__(self, client=None, spreadsheet=SPREADSHEET_NAME):
+        self._client = client
+        self._spreadsheet_name = spreadsheet
+        self._spreadsheet = None
+        self._ws = {}
+        self._start_row = None
+        self._summary_has_header = None
+
+    @property
+    def target(self):
+        return f"sheets:{self._spreadsheet_name}"
+
+    def _sheet(self, name):
+        # every gspread request goes through netio (quota-aware, retried)
+        if name not in self._ws:
+            if self._spreadsheet is None:
+                if self._client is None:
+                    self._client = sheets.get_client()
+                self._spreadsheet = netio.call(SHEETS_HOST, self._client.open, self._spreadsheet_name)
+            ws = netio.call(SHEETS_HOST, self._spreadsheet.worksheet, name)
+            self._ws[name] = netio.Guarded(ws, SHEETS_HOST)
+        return self._ws[name]
+
+    def load_raw(self):
+        values = self._sheet(RAW_SHEET).get_all_values()
+        if len(values) < 2:
+            return pd.DataFrame()
+
+        self.header = [h.strip().lower() for h in values[0]]
+        return pd.DataFrame(values[1:], columns=self.header)
+
+    def existing_keys(self):
+        keys, self.header, self._start_row = sheets.load_existing_keys_and_header(
+            self._sheet(RAW_SHEET), EXPECTED_HEADER
+        )
+        return keys
+
+    def append_raw(self, rows):
+        if self._start_row is None:
+            self.existing_keys()
+
+        values = [
+            [sheets.clean_value(r.get(col, "")) for col in self.header]
+            for r in rows.astype(object).to_dict("records")
+        ]
+        sheets.append_rows_strict(self._sheet(RAW_SHEET), values, self.header, self._start_row)
+        self._start_row += len(values)
+        return len(values)
+
+    def update_raw(self, df, raw):
+        sheets.batch_write(df, self._sheet(RAW_SHEET), self.header, raw)
+
+    def load_summary(self):
+        values = self._sheet(SUMMARY_SHEET).get_all_values()
+        self._summary_has_header = bool(values)
+        if len(values) < 2:
+            return pd.DataFrame()
+
+        headers = [h.strip().lower() for h in values[0]]
+        return pd.DataFrame(values[1:], columns=headers)
+
+    def append_summary(self, row):
+        ws = self._sheet(SUMMARY_SHEET)
+        if self._summary_has_header is None:
+            self._summary_has_header = bool(ws.row_values(1))
+
+        # HEADER (tylko gdy arkusz pusty)
+        if not self._summary_has_header:
+            ws.append_row(SUMMARY_HEADER, value_input_option="RAW")
+            self._summary_has_header = True
+
+        ws.append_row([row.get(c, "") for c in SUMMARY_HEADER], value_input_option="RAW")
+
+
+# ================= SQLITE =================
+SQLITE_PATH = Path("data/gamma.db")
+
+
+def _sql_type(col):
+    if col in REAL_COLUMNS:
+        return "REAL"
+    if col in INTEGER_COLUMNS or col in BOOL_COLUMNS:
+        return "INTEGER"
+    return "TEXT"
+
+
+def _to_sql(col, val):
+    """Sheet-style cell ("" = empty, "TRUE", "0.12") -> typed SQLite value."""
+    if val is None:
+        return None
+    if hasattr(val, "item"):
+        val = val.item()
+    if isinstance(val, float) and (math.isnan(val) or math.isinf(val)):
+        return None
+    if isinstance(val, str):
+        val = val.strip()
+        if val == "":
+            return None
+
+    if col in BOOL_COLUMNS:
+        if isinstance(val, str):
+            return {"TRUE": 1, "FALSE": 0}.get(val.upper())
+        return int(bool(val))
+    if col in REAL_COLUMNS or col in INTEGER_COLUMNS:
+        try:
+            num = float(str(val).replace(",", "")) if isinstance(val, str) else float(val)
+        except ValueError:
+            return None
+        return int(round(num)) if col in INTEGER_COLUMNS else num
+    return str(val)
+
+
+def _q(col):
+    return '"' + col.replace('"', '""') + '"'
+
+
+class SQLiteStorage(StorageBackend):
+    """
+    Local system of record: raw_daily with typed EXPECTED_HEADER columns
+    and a (date, symbol) primary key, plus daily_summary keyed by date.
+    """
+    name = "sqlite"
+
+    def __init__(self, path=SQLITE_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.path)
+        self._create_tables()
+
+    @property
+    def target(self):
+        return f"sqlite:{self.path.resolve().as_posix()}"
+
+    def _create_tables(self):
+        raw_cols = ",\n    ".join(f"{_q(c)} {_sql_type(c)}" for c in EXPECTED_HEADER)
+        summary_cols = ",\n    ".join(f"{_q(c)} {_sql_type(c)}" for c in SUMMARY_HEADER)
+        self.conn.executescript(f"""
+CREATE TABLE IF NOT EXISTS raw_daily (
+    {raw_cols},
+    PRIMARY KEY (date, symbol)
+);
+CREATE TABLE IF NOT EXISTS daily_summary (
+    {summary_cols},
+    PRIMARY KEY (date)
+);
+""")
+        self.conn.commit()
+
+    def _rows(self, df, columns):
+        return [
+            tuple(_to_sql(c, v) for c, v in zip(columns, rec))
+            for rec in df[columns].itertuples(index=False, name=None)
+        ]
+
+    def load_raw(self):
+        df = pd.read_sql_query(
+            f"SELECT {', '.join(_q(c) for c in EXPECTED_HEADER)} FROM raw_daily ORDER BY date, symbol",
+            self.conn,
+        )
+        if df.empty:
+            return pd.DataFrame()
+
+        # text columns come back like sheet cells: "" when empty
+        text = [c for c in EXPECTED_HEADER if _sql_type(c) == "TEXT"]
+        df[text] = df[text].astype(object).fillna("")
+        return df
+
+    def existing_keys(self):
+        return set(self.conn.execute("SELECT date, symbol FROM raw_daily"))
+
+    def append_raw(self, rows):
+        if rows is None or rows.empty:
+            return 0
+
+        rows = rows.copy()
+        for col in EXPECTED_HEADER:
+            if col not in rows.columns:
+                rows[col] = None
+
+        cur = self.conn.executemany(
+            f"INSERT OR IGNORE INTO raw_daily ({', '.join(_q(c) for c in EXPECTED_HEADER)}) "
+            f"VALUES ({', '.join('?' * len(EXPECTED_HEADER))})",
+            self._rows(rows, EXPECTED_HEADER),
+        )
+        self.conn.commit()
+        instrument.count("sqlite.rows_appended", cur.rowcount)
+        print(f"[OK] Appended {cur.rowcount} new raw rows (sqlite)")
+        return cur.rowcount
+
+    def update_raw(self, df, raw=None):
+        columns = [c for c in EXPECTED_HEADER if c in df.columns]
+        if df.empty or not set(KEY).issubset(columns):
+            print("[OK] Nothing to update")
+            return
+
+        updates = [c for c in columns if c not in KEY]
+        # upsert; COALESCE keeps stored values where the new one is empty
+        sql = (
+            f"INSERT INTO raw_daily ({', '.join(_q(c) for c in columns)}) "
+            f"VALUES ({', '.join('?' * len(columns))}) "
+            f"ON CONFLICT(date, symbol) DO UPDATE SET "
+            + ", ".join(f"{_q(c)} = COALESCE(excluded.{_q(c)}, raw_daily.{_q(c)})" for c in updates)
+        )
+        self.conn.executemany(sql, self._rows(df, columns))
+        self.conn.commit()
+        instrument.count("sqlite.rows_upserted", len(df))
+        print(f"[OK] Upserted {len(df)} rows (sqlite)")
+
+    def load_summary(self):
+        df = pd.read_sql_query("SELECT * FROM daily_summary ORDER BY date", self.conn)
+        return df if not df.empty else pd.DataFrame()
+
+    def append_summary(self, row):
+        self.conn.execute(
+            f"INSERT OR IGNORE INTO daily_summary ({', '.join(_q(c) for c in SUMMARY_HEADER)}) "
+            f"VALUES ({', '.join('?' * len(SUMMARY_HEADER))})",
+            [_to_sql(c, row.get(c)) for c in SUMMARY_HEADER],
+        )
+        self.conn.commit()
+
+
+# ================= MIRROR =================
+class MirroredStorage(StorageBackend):
+    """
+    Reads from `primary`; every write goes to `primary` and is then
+    replayed on `mirror` (e.g. SQLite as record, Sheets as a view).
+    """
+    name = "mirrored"
+
+    def __init__(self, primary, mirror):
+        self.primary = primary
+        self.mirror = mirror
+
+    @property
+    def target(self):
+        return f"{self.primary.target}+{self.mirror.target}"
+
+    def load_raw(self):
+        return self.primary.load_raw()
+
+    def existing_keys(self):
+        return self.primary.existing_keys()
+
+    def append_raw(self, rows):
+        n = self.primary.append_raw(rows)
+        keys = self.mirror.existing_keys()
+        missing = [k not in keys for k in zip(rows["date"].astype(str), rows["symbol"].astype(str))]
+        if any(missing):
+            self.mirror.append_raw(rows[missing])
+        return n
+
+    def update_raw(self, df, raw):
+        self.primary.update_raw(df, raw)
+
+        # mirror rows can sit in a different order: align on (date, symbol)
+        mirror_raw = self.mirror.load_raw()
+        if mirror_raw.empty:
+            return
+        position = {k: i for i, k in enumerate(zip(mirror_raw["date"], mirror_raw["symbol"]))}
+        keys = list(zip(df["date"].astype(str), df["symbol"].astype(str)))
+        found = [k in position for k in keys]
+        aligned = df[found].copy()
+        aligned.index = [position[k] for k, ok in zip(keys, found) if ok]
+        self.mirror.update_raw(aligned, mirror_raw)
+
+    def load_summary(self):
+        return self.primary.load_summary()
+
+    def append_summary(self, row):
+        self.primary.append_summary(row)
+        existing = self.mirror.load_summary()
+        if existing.empty or row["date"] not in set(existing["date"]):
+            self.mirror.append_summary(row)
+
+
+# ================= FACTORY =================
+def get_storage(name=None):
+    """
+    STORAGE_BACKEND=sheets (default) | sqlite; with sqlite,
+    SHEETS_MIRROR=1 keeps the Google Sheet updated as a mirror.
+    """
+    name = name or os.environ.get("STORAGE_BACKEND", "sheets")
+
+    if name == "sheets":
+        return SheetsStorage()
+    if name == "sqlite":
+        store = SQLiteStorage(os.environ.get("SQLITE_PATH", SQLITE_PATH))
+        if os.environ.get("SHEETS_MIRROR", "").lower() in ("1", "true", "yes"):
+            return MirroredStorage(store, SheetsStorage())
+        return store
+
+    raise ValueError(f"Unknown storage backend: {name}")
@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+
+# ================= CONFIG =================
+CALENDAR_NAME = "NYSE"
+CACHE_PATH = Path("data/cache/nyse_sessions.npy")
+FIRST_YEAR = 2015
+YEARS_AHEAD = 2
+
+
+def _day(d):
+    return np.datetime64(pd.Timestamp(d).date(), "D")
+
+
+def _days(dates):
+    return pd.to_datetime(pd.Series(dates), errors="coerce").to_numpy(dtype="datetime64[D]")
+
+
+# ================= SESSION INDEX =================
+class TradingCalendar:
+    """
+    Sorted datetime64[D] array of exchange sessions. Built once from
+    pandas_market_calendars (weekends, holidays; half-days are sessions),
+    cached on disk, and queried with searchsorted — O(log n) per date.
+    """
+
+    def __init__(self, sessions):
+        self.sessions = np.asarray(sessions, dtype="datetime64[D]")
+
+    @classmethod
+    def build(cls, start, end, name=CALENDAR_NAME):
+        import pandas_market_calendars as mcal
+
+        schedule = mcal.get_calendar(name).schedule(start_date=start, end_date=end)
+        return cls(schedule.index.to_numpy(dtype="datetime64[D]"))
+
+    @classmethod
+    def load(cls, path=CACHE_PATH, first_year=FIRST_YEAR, years_ahead=YEARS_AHEAD):
+        """Cached index covering first_year .. today + years_ahead; rebuilt when short."""
+        start = np.datetime64(f"{first_year}-01-01", "D")
+        end = np.datetime64(f"{datetime.utcnow().year + years_ahead}-12-31", "D")
+
+        path = Path(path)
+        if path.exists():
+            sessions = np.load(path)
+            # the cache holds full years, so covering the end year is enough
+            if len(sessions) and sessions[0] <= start + 7 and sessions[-1] >= end - 7:
+                return cls(sessions)
+
+        cal = cls.build(str(start), str(end))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.save(path, cal.sessions)
+        return cal
+
+    # ---------- queries ----------
+    def is_session(self, d):
+        d = _day(d)
+        i = np.searchsorted(self.sessions, d)
+        return bool(i < len(self.sessions) and self.sessions[i] == d)
+
+    def last_session(self, on_or_before):
+        """Latest session <= the given date (None before the index starts)."""
+        i = np.searchsorted(self.sessions, _day(on_or_before), side="right") - 1
+        return None if i < 0 else pd.Timestamp(self.sessions[i]).strftime("%Y-%m-%d")
+
+    def next_sessions(self, after, n):
+        """The n sessions strictly after `after` (fewer at the end of the index)."""
+        i = np.searchsorted(self.sessions, _day(after), side="right")
+        return [pd.Timestamp(d).strftime("%Y-%m-%d") for d in self.sessions[i:i + n]]
+
+    def session_offset(self, dates, n):
+        """
+        n-th session after each date, counted from the last session on or
+        before it (vectorized; NaT where the index runs out).
+        """
+        d = _days(dates)
+        pos = np.searchsorted(self.sessions, d, side="right") - 1 + n
+        ok = ~np.isnat(d) & (pos >= 0) & (pos < len(self.sessions))
+        out = np.full(len(d), np.datetime64("NaT"), dtype="datetime64[D]")
+        out[ok] = self.sessions[pos[ok]]
+        return out
+
+    def session_distance(self, start, end):
+        """Number of sessions from start to end (vectorized; negative if end < start)."""
+        a = np.searchsorted(self.sessions, _days(np.atleast_1d(start)), side="right")
+        b = np.searchsorted(self.sessions, _days(np.atleast_1d(end)), side="right")
+        return b - a
+
+
+@lru_cache(maxsize=1)
+def get_calendar():
+    return TradingCalendar.load()
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# the pipeline scripts import each other as top-level modules from src/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
@@ -0,0 +1,33 @@
+import pandas as pd
+
+import daily_summary
+import snapshot_store
+
+
+def _rows(date, symbols):
+    return pd.DataFrame({
+        "date": date, "symbol": symbols, "spot": 100.0,
+        "dnz_low": 95.0, "dnz_high": 105.0, "gamma_above": 1.0, "gamma_below": 1.0,
+    })
+
+
+def test_backfilled_older_partition_is_indexed(tmp_path):
+    root, index = tmp_path / "store", tmp_path / "latest.json"
+    snapshot_store.append(_rows("2026-10-15", ["SPY", "QQQ"]), root)
+    assert set(daily_summary.summarize(root=root, path=index)["symbol"]) == {"SPY", "QQQ"}
+
+    # a backfill writes an earlier date after the index was built
+    snapshot_store.append(_rows("2026-09-01", ["SPY", "NVDA"]), root)
+    latest = daily_summary.latest_index(root, index)
+    assert latest == {"SPY": "2026-10-15", "QQQ": "2026-10-15", "NVDA": "2026-09-01"}
+
+
+def test_compaction_keeps_index(tmp_path):
+    root, index = tmp_path / "store", tmp_path / "latest.json"
+    snapshot_store.append(_rows("2026-10-15", ["SPY"]), root)
+    snapshot_store.append(_rows("2026-10-15", ["QQQ"]), root)
+    daily_summary.latest_index(root, index)
+
+    snapshot_store.compact("2026-10-15", root)
+    snapshot_store.append(_rows("2026-10-16", ["SPY"]), root)
+    assert daily_summary.latest_index(root, index) == {"SPY": "2026-10-16", "QQQ": "2026-10-15"}
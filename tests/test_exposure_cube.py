@@ -0,0 +1,36 @@
+import numpy as np
+
+import main
+from exposure_cube import CUBE_PATH, GammaCube, load_cube, load_cubes, save_cube, save_cubes
+
+
+def _cube(seed):
+    rng = np.random.default_rng(seed)
+    return GammaCube([90.0, 100.0, 110.0], [5, 12], rng.random((3, 2, 2)))
+
+
+def test_one_file_per_date(tmp_path):
+    save_cubes({"SPY": (_cube(0), 100.0), "BRK.B": (_cube(1), 101.0)}, "2026-10-15", tmp_path)
+    save_cube(_cube(2), "2026-10-15", "QQQ", 99.0, tmp_path)
+    save_cube(_cube(3), "2026-10-15", "SPY", 100.5, tmp_path)
+
+    assert [p.name for p in tmp_path.iterdir()] == ["date=2026-10-15.npz"]
+    cubes = load_cubes("2026-10-15", tmp_path)
+    assert sorted(cubes) == ["BRK.B", "QQQ", "SPY"]
+    assert np.array_equal(cubes["SPY"].gamma, _cube(3).gamma)
+    assert np.array_equal(load_cube("2026-10-15", "BRK.B", tmp_path).strikes, [90.0, 100.0, 110.0])
+    assert load_cube("2026-10-16", "SPY", tmp_path) is None
+
+
+def test_run_universe_batches_cubes(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    report, snapshots = main.run_universe(["SPY", "QQQ", "AAPL"], workers=1, provider="local")
+    assert (report["status"] == "ok").all()
+
+    (market_date,) = set(snapshots["date"])
+    assert [p.name for p in CUBE_PATH.iterdir()] == [f"date={market_date}.npz"]
+    cubes = load_cubes(market_date)
+    assert sorted(cubes) == ["AAPL", "QQQ", "SPY"]
+
+    spy = snapshots.set_index("symbol").loc["SPY"]
+    assert cubes["SPY"].split(spy["spot"])[0] == spy["gamma_above"]
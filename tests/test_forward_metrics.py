@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import append_to_sheets
+import postprocess
+from forward_metrics import fill_forward_returns
+from trading_calendar import TradingCalendar
+
+# NYSE around Thanksgiving 2026: Thu 11-26 closed, Fri 11-27 half day
+SESSIONS = ["2026-11-23", "2026-11-24", "2026-11-25", "2026-11-27",
+            "2026-11-30", "2026-12-01", "2026-12-02", "2026-12-03"]
+CALENDAR = TradingCalendar(np.array(SESSIONS, dtype="datetime64[D]"))
+
+
+def _raw(dates, symbol="SPY"):
+    return pd.DataFrame({
+        "date": dates,
+        "symbol": symbol,
+        "spot": [100.0 + i for i in range(len(dates))],
+        "close_t+1": "",
+    })
+
+
+def _by_date(df):
+    return df.set_index("date")
+
+
+def test_forward_close_is_n_sessions_later():
+    df = fill_forward_returns(_raw(SESSIONS[:5]), horizons=[1, 2], calendar=CALENDAR)
+    out = _by_date(df)
+
+    # t+1 of the day before the holiday is the half day, not the holiday
+    assert out.loc["2026-11-25", "close_t+1"] == 103.0
+    assert out.loc["2026-11-25", "close_t+2"] == 104.0
+    assert out.loc["2026-11-25", "ret_t+1"] == pytest.approx(103.0 / 102.0 - 1)
+    assert out.loc["2026-11-24", "days_to_close_t+2"] == 2
+    # no snapshot yet for the future session
+    assert out.loc["2026-11-30", "close_t+1"] == ""
+
+
+def test_missing_session_leaves_horizon_blank():
+    # no snapshot on 12-01: 11-30's t+1 must stay blank, not borrow 12-02
+    dates = ["2026-11-27", "2026-11-30", "2026-12-02", "2026-12-03"]
+    out = _by_date(fill_forward_returns(_raw(dates), horizons=[1, 2], calendar=CALENDAR))
+
+    assert out.loc["2026-11-30", "close_t+1"] == ""
+    assert out.loc["2026-11-30", "ret_t+1"] == ""
+    assert out.loc["2026-11-30", "close_t+2"] == 102.0
+    assert out.loc["2026-11-27", "close_t+1"] == 101.0
+    assert out.loc["2026-11-27", "close_t+2"] == ""
+
+
+def test_filled_cells_are_kept_and_symbols_do_not_mix():
+    df = pd.concat([_raw(SESSIONS[:3], "SPY"), _raw(SESSIONS[1:3], "QQQ")], ignore_index=True)
+    df.loc[0, "close_t+1"] = "99"
+    df = df.sort_values(["symbol", "date"], ignore_index=True)
+    out = fill_forward_returns(df, horizons=[1], calendar=CALENDAR).set_index(["symbol", "date"])
+
+    assert out.loc[("SPY", "2026-11-23"), "close_t+1"] == "99"
+    assert out.loc[("QQQ", "2026-11-24"), "close_t+1"] == 101.0
+    assert out.loc[("QQQ", "2026-11-25"), "close_t+1"] == ""
+
+
+def test_append_to_sheets_uses_postprocess_wrapper(monkeypatch):
+    assert append_to_sheets.enrich_forward_metrics is postprocess.enrich_forward_metrics
+
+    monkeypatch.setattr("forward_metrics.get_calendar", lambda: CALENDAR)
+    # sheet cells come back as strings
+    df = _raw(["2026-11-25", "bad", "2026-11-24"]).astype({"spot": str})
+    out = postprocess.enrich_forward_metrics(df, horizons=[1])
+
+    # unparseable rows dropped, rows sorted by (symbol, date) before the lookup
+    assert list(out["date"]) == ["2026-11-24", "2026-11-25"]
+    assert _by_date(out).loc["2026-11-24", "close_t+1"] == 100.0
+    assert _by_date(out).loc["2026-11-24", "ret_t+1"] == pytest.approx(100.0 / 102.0 - 1)
@@ -0,0 +1,38 @@
+import numpy as np
+
+import main
+from benchmark import SPOT, reference_greeks, synthetic_options
+from option_chain import OptionChain
+from scenario import GREEKS_TOLERANCE
+
+
+def _errors(delta_exp, gamma_exp, chain, ref_delta, ref_gamma):
+    weight = chain["oi"].to_numpy() / np.sqrt(np.maximum(chain["dte"].to_numpy(), 1))
+    delta_err = np.max(np.abs(delta_exp - ref_delta) / weight)
+    gamma_err = np.max(np.abs(gamma_exp - ref_gamma) / np.maximum(np.abs(ref_gamma), 1e-300))
+    return delta_err, gamma_err
+
+
+def test_greeks_match_py_vollib():
+    chain = synthetic_options(300, seed=7)
+    ref_delta, ref_gamma = reference_greeks(chain, SPOT)
+
+    df = main.compute_greeks(chain.copy(), SPOT)
+    delta_err, gamma_err = _errors(df["delta_exp"], df["gamma_exp"], chain, ref_delta, ref_gamma)
+    assert delta_err <= GREEKS_TOLERANCE
+    assert gamma_err <= GREEKS_TOLERANCE
+
+    compact = main.compute_greeks(OptionChain.from_frame(chain), SPOT)
+    delta_err, gamma_err = _errors(compact.delta_exp, compact.gamma_exp, chain, ref_delta, ref_gamma)
+    assert delta_err <= GREEKS_TOLERANCE
+    assert gamma_err <= GREEKS_TOLERANCE
+
+
+def test_unpriceable_contracts_are_zero():
+    chain = synthetic_options(4, seed=1)
+    chain.loc[0, "iv"] = 0.0
+    chain.loc[1, "strike"] = np.nan
+    df = main.compute_greeks(chain, SPOT)
+
+    assert (df.loc[:1, ["delta_exp", "gamma_exp"]] == 0).all().all()
+    assert (df.loc[2:, "gamma_exp"] > 0).all()
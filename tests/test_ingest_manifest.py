@@ -0,0 +1,33 @@
+import pandas as pd
+
+import append_snapshots_to_raw
+import snapshot_store
+from storage import SQLiteStorage
+
+
+def _rows(date, symbols):
+    return pd.DataFrame({"date": date, "symbol": symbols, "spot": 1.0})
+
+
+def _append(path):
+    append_snapshots_to_raw.main(SQLiteStorage(path))
+    return SQLiteStorage(path).existing_keys()
+
+
+def test_new_target_gets_every_row(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    snapshot_store.append(_rows("2026-10-14", ["SPY", "QQQ"]))
+    assert len(_append("a.db")) == 2
+
+    snapshot_store.append(_rows("2026-10-15", ["SPY", "QQQ", "AAPL"]))
+    assert len(_append("a.db")) == 5
+    assert len(_append("b.db")) == 5
+
+
+def test_reset_target_is_rescanned(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    snapshot_store.append(_rows("2026-10-14", ["SPY", "QQQ"]))
+    assert len(_append("a.db")) == 2
+
+    (tmp_path / "a.db").unlink()
+    assert len(_append("a.db")) == 2
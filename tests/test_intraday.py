@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+
+import intraday
+import main
+from option_chain import OptionChain
+from providers import LocalProvider
+
+SYMBOL = "SPY"
+COMPARED = [
+    "spot", "dnz_low", "dnz_mid", "dnz_high", "effective_gamma_pressure",
+    "gamma_above", "gamma_below", "gamma_peak_price", "gamma_flip",
+]
+
+
+class FlakyProvider(LocalProvider):
+    """Synthetic chains until `fail` is set: then empty frames or errors."""
+    fail = None
+
+    def option_chain(self, symbol, expiry):
+        if self.fail == "empty":
+            calls, puts = super().option_chain(symbol, expiry)
+            return calls.iloc[:0], puts.iloc[:0]
+        if self.fail == "error":
+            raise ConnectionError("chain fetch failed")
+        return super().option_chain(symbol, expiry)
+
+
+def _tick(states, provider, refresh_chain=True):
+    return intraday.tick(states, [SYMBOL], provider, refresh_chain=refresh_chain, timestamp="t")
+
+
+def test_tick_matches_daily_snapshot(tmp_path):
+    provider = LocalProvider(root=tmp_path)
+    row = _tick({}, provider).iloc[0]
+
+    market_date = main.get_last_market_date()
+    spot = intraday.fetch_spot(SYMBOL, provider)
+    daily = main.build_snapshot(SYMBOL, market_date, spot, main.load_options(SYMBOL, provider=provider)).iloc[0]
+
+    # same grid and rule: DNZ within one grid step, EGP from the same two points
+    step = (2 * main.SCENARIO_RANGE * spot) / (main.SCENARIO_POINTS - 1)
+    assert row["dnz_mid"] == pytest.approx(daily["dnz_mid"], abs=step)
+    assert row["dnz_high"] - row["dnz_low"] == pytest.approx(daily["dnz_high"] - daily["dnz_low"])
+    assert row["effective_gamma_pressure"] == pytest.approx(daily["effective_gamma_pressure"], rel=1e-9)
+    for col in ["gamma_above", "gamma_below", "gamma_flip"]:
+        assert row[col] == pytest.approx(daily[col], rel=1e-3), col
+    assert set(COMPARED) <= set(row.index)
+
+
+@pytest.mark.parametrize("failure", ["empty", "error"])
+def test_bad_refresh_keeps_previous_chain(tmp_path, failure):
+    provider = FlakyProvider(root=tmp_path)
+    states = {}
+    before = _tick(states, provider).iloc[0]
+
+    provider.fail = failure
+    after = _tick(states, provider).iloc[0]
+
+    assert len(states[SYMBOL].chain) > 0
+    for col in COMPARED:
+        assert after[col] == pytest.approx(before[col], nan_ok=True), col
+
+
+def test_empty_chain_on_rebuild_is_skipped(tmp_path):
+    provider = FlakyProvider(root=tmp_path)
+    provider.fail = "empty"
+    states = {}
+    assert _tick(states, provider).empty
+    assert states == {}
+
+
+def test_refresh_reprices_only_changes(tmp_path):
+    provider = LocalProvider(root=tmp_path)
+    spot = intraday.fetch_spot(SYMBOL, provider)
+    chain = main.load_options(SYMBOL, provider=provider)
+    state = intraday.ChainState(SYMBOL, "2026-10-16", spot)
+
+    assert state.apply(chain) == len(chain)
+    assert state.apply(chain) == 0
+
+    oi = chain.oi.copy()
+    oi[:3] += 1
+    changed = OptionChain(chain.strike, chain.iv, chain.dte, chain.is_call, oi)
+    assert state.apply(changed) == 3
+    assert np.isfinite(state.net_delta).all()
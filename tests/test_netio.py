@@ -0,0 +1,54 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+import fake_server
+import main
+import netio
+
+
+def _yahoo_policy():
+    p = netio.get_fetcher().policy("yahoo")
+    return p.concurrency, p.rate, p.burst
+
+
+def test_share_splits_policy():
+    p = netio.HostPolicy(concurrency=4, rate=2.0, burst=4).share(4)
+    assert (p.concurrency, p.rate, p.burst) == (1, 0.5, 1)
+
+
+@pytest.mark.parametrize("workers", [1, 2, 3, 4, 5, 8, 16])
+def test_pool_never_exceeds_host_limits(workers):
+    # non-divisible and n > concurrency pools included
+    yahoo = netio.HOST_POLICIES["yahoo"]
+    n = netio.pool_size(workers, ["yahoo"])
+    share = yahoo.share(n)
+
+    assert 1 <= n <= workers
+    assert n * share.concurrency <= yahoo.concurrency
+    assert n * share.burst <= yahoo.burst
+    assert n * share.rate <= yahoo.rate + 1e-12
+
+
+def test_pool_size_without_network():
+    assert netio.pool_size(8, []) == 8
+    assert main._network_hosts(replay=True) == []
+    assert main._network_hosts(provider="local") == []
+    assert main._network_hosts(provider="yfinance") == ["yahoo"]
+
+
+def test_pool_workers_share_host_limits():
+    with ProcessPoolExecutor(max_workers=4, initializer=netio.share_limits, initargs=(4, ["yahoo"])) as pool:
+        concurrency, rate, burst = pool.submit(_yahoo_policy).result()
+
+    yahoo = netio.HOST_POLICIES["yahoo"]
+    assert 4 * concurrency <= yahoo.concurrency
+    assert 4 * rate <= yahoo.rate
+    assert 4 * burst <= yahoo.burst
+
+
+def test_fake_server_check():
+    report = fake_server.check(requests=30, seed=1)
+    assert report["passed"], report
+    assert report["server_throttled"] > 0
+    assert report["peak_in_flight"] <= 4
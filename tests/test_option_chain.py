@@ -0,0 +1,73 @@
+from datetime import datetime
+
+import pandas as pd
+
+import main
+from benchmark import synthetic_options
+from main import load_options
+from option_chain import COMPACT_FLOAT, OptionChain
+from providers import LocalProvider
+
+NOW = datetime(2026, 10, 16)
+
+
+class FarExpiryProvider(LocalProvider):
+    """Only expiries beyond the MAX_DTE window."""
+
+    def expiries(self, symbol):
+        return ["2027-06-18"]
+
+
+class NoLiquidityProvider(LocalProvider):
+    """Every contract fails the OI > 0 / IV > 0 filter."""
+
+    def option_chain(self, symbol, expiry):
+        calls, puts = super().option_chain(symbol, expiry)
+        return calls.assign(openInterest=0.0), puts.assign(impliedVolatility=0.0)
+
+
+def test_blank_chain():
+    chain = OptionChain.blank()
+    assert chain.empty
+    assert len(chain) == 0
+    assert list(chain.to_frame().columns) == ["strike", "oi", "iv", "dte", "type"]
+
+
+def test_concat_of_nothing_is_blank():
+    assert OptionChain.concat([None, None]).empty
+
+
+def test_load_options_no_expiry_in_window(tmp_path):
+    chain = load_options("SPY", provider=FarExpiryProvider(root=tmp_path, now=NOW), now=NOW)
+    assert isinstance(chain, OptionChain)
+    assert chain.empty
+
+
+def test_load_options_everything_filtered(tmp_path):
+    chain = load_options("SPY", provider=NoLiquidityProvider(root=tmp_path, now=NOW), now=NOW)
+    assert chain.empty
+
+
+def test_load_options_synthetic(tmp_path):
+    chain = load_options("SPY", provider=LocalProvider(root=tmp_path, now=NOW), now=NOW)
+    assert not chain.empty
+    assert (chain.oi > 0).all() and (chain.iv > 0).all()
+    assert ((chain.dte > 0) & (chain.dte <= 30)).all()
+    assert isinstance(chain.to_frame(), pd.DataFrame)
+
+
+def test_default_chain_keeps_float64_greeks():
+    frame = synthetic_options(300)
+    chain = OptionChain.from_frame(frame)
+    assert chain.strike.dtype == "float64" and chain.iv.dtype == "float64"
+
+    main.compute_greeks(chain, 500.0)
+    main.compute_greeks(frame, 500.0)
+    assert (chain.delta_exp == frame["delta_exp"].to_numpy()).all()
+    assert (chain.gamma_exp == frame["gamma_exp"].to_numpy()).all()
+
+
+def test_compact_chain_is_opt_in():
+    chain = OptionChain([100.0], [0.2], [5], [True], [10], float_dtype=COMPACT_FLOAT)
+    assert chain.strike.dtype == "float32"
+    assert chain.take([0]).strike.dtype == "float32"
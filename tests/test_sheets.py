@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+
+from sheets import batch_write, coalesce_ranges, diff_cells
+
+HEADERS = ["date", "symbol", "data_ok", "pipeline_version", "run_id"]
+
+
+class FakeWorksheet:
+    def __init__(self):
+        self.requests = []
+
+    def batch_update(self, updates, value_input_option=None):
+        self.requests.append(updates)
+
+
+def _frames(n=5):
+    raw = pd.DataFrame({
+        "date": [f"2026-10-{i + 1:02d}" for i in range(n)],
+        "symbol": "SPY",
+        "data_ok": "FALSE",
+        "pipeline_version": "v1.0.0",
+        "run_id": "old",
+    })
+    df = raw.copy()
+    df["data_ok"] = True
+    df["pipeline_version"] = "v1.1.0"
+    df["run_id"] = "new"
+    return df, raw
+
+
+def test_diff_cells_only_changed_values():
+    raw = pd.DataFrame({"date": ["2026-10-01"], "symbol": ["SPY"], "data_ok": ["TRUE"],
+                        "pipeline_version": ["1,234.5"], "run_id": ["x"]})
+    df = pd.DataFrame({"date": ["2026-10-01"], "symbol": ["SPY"], "data_ok": [True],
+                       "pipeline_version": [1234.5000001], "run_id": [""]})
+    # bool vs "TRUE", display rounding and empty values are not changes
+    assert diff_cells(df, raw, HEADERS) == []
+
+    df["run_id"] = "y"
+    df["extra"] = 1
+    assert diff_cells(df, raw, HEADERS) == [(0, 4, "y")]
+
+
+def test_diff_cells_missing_raw_column():
+    raw = pd.DataFrame({"date": ["2026-10-01"], "symbol": ["SPY"]})
+    df = raw.assign(data_ok=np.array([True]))
+    assert diff_cells(df, raw, HEADERS) == [(0, 2, True)]
+
+
+def test_coalesce_stacks_each_column_span():
+    cells = [(r, c, f"{r}:{c}") for r in range(5) for c in (2, 3, 4)]
+    blocks = coalesce_ranges(cells)
+    assert [(b["r0"], b["r1"], b["c0"], b["c1"]) for b in blocks] == [(0, 4, 2, 4)]
+    assert blocks[0]["values"][4] == ["4:2", "4:3", "4:4"]
+
+    # data_ok and run_id change on every row: two spans per row
+    cells = [(r, c, 0) for r in range(5) for c in (2, 4)]
+    blocks = coalesce_ranges(cells)
+    assert sorted((b["r0"], b["r1"], b["c0"], b["c1"]) for b in blocks) == [(0, 4, 2, 2), (0, 4, 4, 4)]
+    assert all(len(b["values"]) == 5 for b in blocks)
+
+
+def test_coalesce_breaks_on_gap():
+    blocks = coalesce_ranges([(0, 1, "a"), (1, 1, "b"), (3, 1, "c")])
+    assert [(b["r0"], b["r1"], b["values"]) for b in blocks] == [(0, 1, [["a"], ["b"]]), (3, 3, [["c"]])]
+
+
+def test_batch_write_one_range_per_span():
+    df, raw = _frames()
+    df["pipeline_version"] = raw["pipeline_version"]
+    ws = FakeWorksheet()
+    batch_write(df, ws, HEADERS, raw)
+
+    (updates,) = ws.requests
+    # data_ok and run_id, rows 2-6 (header + 1-indexing)
+    assert sorted(u["range"] for u in updates) == ["C2:C6", "E2:E6"]
+
+
+def test_batch_write_nothing_changed():
+    _, raw = _frames()
+    ws = FakeWorksheet()
+    batch_write(raw.copy(), ws, HEADERS, raw)
+    assert ws.requests == []